@@ -0,0 +1,37 @@
+"""add trigram search indexes on controls
+
+Revision ID: 003_controls_search_indexes
+Revises: 002_controls_embedding
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "003_controls_search_indexes"
+down_revision: Union[str, None] = "002_controls_embedding"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_TRGM_COLUMNS = ("control_id", "title", "description")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for col in _TRGM_COLUMNS:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_controls_{col}_trgm "
+            f"ON controls USING gin ({col} gin_trgm_ops)"
+        )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_controls_control_id_lower "
+        "ON controls (lower(control_id))"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_controls_control_id_lower")
+    for col in _TRGM_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_controls_{col}_trgm")
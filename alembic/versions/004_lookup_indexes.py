@@ -0,0 +1,36 @@
+"""add composite indexes for mapping and version-change lookups
+
+Revision ID: 004_lookup_indexes
+Revises: 003_controls_search_indexes
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "004_lookup_indexes"
+down_revision: Union[str, None] = "003_controls_search_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_mappings_src_tgt", "mappings",
+        ["source_control_id", "target_control_id"], if_not_exists=True,
+    )
+    op.create_index(
+        "ix_mappings_tgt_src", "mappings",
+        ["target_control_id", "source_control_id"], if_not_exists=True,
+    )
+    op.create_index(
+        "ix_vc_fw_old_new", "version_changes",
+        ["framework_id", "old_version", "new_version"], if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vc_fw_old_new", table_name="version_changes", if_exists=True)
+    op.drop_index("ix_mappings_tgt_src", table_name="mappings", if_exists=True)
+    op.drop_index("ix_mappings_src_tgt", table_name="mappings", if_exists=True)
@@ -0,0 +1,38 @@
+"""make (source_control_id, target_control_id) unique on mappings
+
+Revision ID: 005_mapping_pair_unique
+Revises: 004_lookup_indexes
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "005_mapping_pair_unique"
+down_revision: Union[str, None] = "004_lookup_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the oldest row of any duplicated pair before adding the constraint.
+    op.execute(
+        "DELETE FROM mappings m USING mappings d "
+        "WHERE m.source_control_id = d.source_control_id "
+        "AND m.target_control_id = d.target_control_id "
+        "AND m.id > d.id"
+    )
+    op.create_unique_constraint(
+        "uq_mapping_pair", "mappings", ["source_control_id", "target_control_id"]
+    )
+    # The unique index covers source->target lookups now.
+    op.drop_index("ix_mappings_src_tgt", table_name="mappings", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_mappings_src_tgt", "mappings",
+        ["source_control_id", "target_control_id"], if_not_exists=True,
+    )
+    op.drop_constraint("uq_mapping_pair", "mappings", type_="unique")
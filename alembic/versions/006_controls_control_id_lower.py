@@ -0,0 +1,35 @@
+"""add generated control_id_lower column on controls
+
+Revision ID: 006_controls_control_id_lower
+Revises: 005_mapping_pair_unique
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "006_controls_control_id_lower"
+down_revision: Union[str, None] = "005_mapping_pair_unique"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "controls",
+        sa.Column("control_id_lower", sa.String(50), sa.Computed("lower(control_id)", persisted=True)),
+    )
+    # Replaces the expression index from 003 with a plain index on the column.
+    op.execute("DROP INDEX IF EXISTS ix_controls_control_id_lower")
+    op.create_index("ix_controls_control_id_lower", "controls", ["control_id_lower"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_controls_control_id_lower", table_name="controls")
+    op.drop_column("controls", "control_id_lower")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_controls_control_id_lower "
+        "ON controls (lower(control_id))"
+    )
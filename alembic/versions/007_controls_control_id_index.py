@@ -0,0 +1,26 @@
+"""add btree index on controls.control_id
+
+Revision ID: 007_controls_control_id_index
+Revises: 006_controls_control_id_lower
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "007_controls_control_id_index"
+down_revision: Union[str, None] = "006_controls_control_id_lower"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_controls_control_id", "controls", ["control_id"], if_not_exists=True)
+    # Refresh planner statistics so the new indexes are picked up right away.
+    op.execute("ANALYZE controls")
+    op.execute("ANALYZE mappings")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_controls_control_id", table_name="controls", if_exists=True)
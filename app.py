@@ -1,18 +1,27 @@
 """Compliance Mapping Tool - FastAPI Backend."""
 
+import asyncio
+import csv
+import hashlib
+import time
+from collections import Counter, OrderedDict, defaultdict
 from contextlib import asynccontextmanager
-from io import BytesIO
+from io import BytesIO, StringIO
 from typing import Optional
 
-from fastapi import FastAPI, Depends, UploadFile, File, Form, HTTPException, Query
+import orjson
+from fastapi import FastAPI, Depends, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy import select, func, or_, and_, case
+from sqlalchemy import select, insert, func, or_, and_, case, bindparam, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from database import (
-    init_db, get_session,
+    init_db, get_session, insert_ignore,
     Framework, Control, Mapping, VersionChange,
 )
 from document_parser import parse_uploaded_bytes, list_parsers
@@ -146,6 +155,9 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan,
 )
+# Coverage tables and control lists are repetitive JSON and compress well;
+# small responses are not worth the CPU.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 # ---------------------------------------------------------------------------
@@ -162,6 +174,67 @@ async def llm_status():
     return get_provider_status()
 
 
+# ---------------------------------------------------------------------------
+# Response cache for rarely-changing reads
+# ---------------------------------------------------------------------------
+# In-process, so each uvicorn worker keeps its own copy; writes made through
+# another worker become visible there once the TTL expires. 0 disables it.
+# Entries are kept in LRU order and capped at API_CACHE_MAXSIZE per worker.
+
+API_CACHE_TTL = float(os.environ.get("API_CACHE_TTL", "300"))
+API_CACHE_MAXSIZE = int(os.environ.get("API_CACHE_MAXSIZE", "256"))
+_response_cache: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+
+
+def _cache_get(key: tuple):
+    hit = _response_cache.get(key)
+    if hit is None:
+        return None
+    if hit[0] <= time.monotonic():
+        del _response_cache[key]
+        return None
+    _response_cache.move_to_end(key)
+    return hit[1]
+
+
+def _cache_set(key: tuple, value):
+    if API_CACHE_TTL > 0 and API_CACHE_MAXSIZE > 0:
+        _response_cache[key] = (time.monotonic() + API_CACHE_TTL, value)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > API_CACHE_MAXSIZE:
+            _response_cache.popitem(last=False)
+    return value
+
+
+def invalidate_cache():
+    """Drop all cached responses. Call after writes to frameworks/controls/versions."""
+    _response_cache.clear()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an If-None-Match header (RFC 9110)."""
+    for token in if_none_match.split(","):
+        token = token.strip()
+        if token == "*" or token.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _conditional_json(request: Request, payload) -> Response:
+    """Serialize ``payload`` with a content-hash ETag and honour If-None-Match.
+
+    ``no-cache`` makes browsers revalidate every time, so an import is still
+    visible on the next page load; unchanged data costs a 304 instead of the
+    full body.
+    """
+    body = orjson.dumps(jsonable_encoder(payload))
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
 # ---------------------------------------------------------------------------
 # API routes
 # ---------------------------------------------------------------------------
@@ -202,24 +275,48 @@ async def implementation_summary(
     }
 
 
+# ---------------------------------------------------------------------------
+# Shared statements
+# ---------------------------------------------------------------------------
+# Built once at import time; per-request values go in as bind parameters so
+# every call reuses the same statement object and its compiled-SQL cache key.
+
+_FRAMEWORK_BY_SHORT_NAME = select(Framework).where(Framework.short_name == bindparam("short_name"))
+_FRAMEWORKS_WITH_COUNTS = (
+    select(
+        Framework,
+        func.count(Control.id).label("control_count"),
+    )
+    .outerjoin(Control, Framework.id == Control.framework_id)
+    .group_by(Framework.id)
+)
+
+
+async def _load_frameworks(session: AsyncSession, column, *keys) -> list[Optional[Framework]]:
+    """Fetch several frameworks by ``column`` in one query.
+
+    Returns them in ``keys`` order, with None for keys that do not exist, so
+    endpoints taking a source and a target framework need one round trip.
+    """
+    rows = (await session.scalars(select(Framework).where(column.in_(set(keys))))).all()
+    by_key = {getattr(fw, column.key): fw for fw in rows}
+    return [by_key.get(k) for k in keys]
+
+
 # ---------------------------------------------------------------------------
 # Frameworks
 # ---------------------------------------------------------------------------
 
 
 @app.get("/api/frameworks", response_model=list[FrameworkOut])
-async def list_frameworks(session: AsyncSession = Depends(get_session)):
+async def list_frameworks(request: Request, session: AsyncSession = Depends(get_session)):
     """List all frameworks with their control counts."""
-    stmt = (
-        select(
-            Framework,
-            func.count(Control.id).label("control_count"),
-        )
-        .outerjoin(Control, Framework.id == Control.framework_id)
-        .group_by(Framework.id)
-    )
-    rows = (await session.execute(stmt)).all()
-    return [
+    cached = _cache_get(("frameworks",))
+    if cached is not None:
+        return _conditional_json(request, cached)
+
+    rows = (await session.execute(_FRAMEWORKS_WITH_COUNTS)).all()
+    frameworks = _cache_set(("frameworks",), [
         FrameworkOut(
             id=fw.id,
             name=fw.name,
@@ -230,7 +327,8 @@ async def list_frameworks(session: AsyncSession = Depends(get_session)):
             control_count=cnt,
         )
         for fw, cnt in rows
-    ]
+    ])
+    return _conditional_json(request, frameworks)
 
 
 class FrameworkCreate(BaseModel):
@@ -247,7 +345,7 @@ async def create_framework(
 ):
     """Create a new empty framework. Controls can be imported afterwards via /api/import."""
     existing = (await session.execute(
-        select(Framework).where(Framework.short_name == body.short_name)
+        _FRAMEWORK_BY_SHORT_NAME, {"short_name": body.short_name}
     )).scalar_one_or_none()
     if existing:
         raise HTTPException(400, f"Framework '{body.short_name}' already exists (id={existing.id}).")
@@ -261,6 +359,7 @@ async def create_framework(
     )
     session.add(fw)
     await session.commit()
+    invalidate_cache()
     await session.refresh(fw)
     return FrameworkOut(
         id=fw.id,
@@ -283,18 +382,17 @@ async def framework_description_stats(
     Used by the frontend to warn users when controls lack descriptions,
     which degrades AI mapping accuracy.
     """
-    total = (await session.execute(
-        select(func.count(Control.id)).where(Control.framework_id == framework_id)
-    )).scalar_one()
-
-    with_desc = (await session.execute(
-        select(func.count(Control.id)).where(
-            Control.framework_id == framework_id,
-            Control.description != "",
-            Control.description.isnot(None),
-            func.length(Control.description) > 20,
-        )
-    )).scalar_one()
+    # Both counts in one round trip via a filtered aggregate.
+    total, with_desc = (await session.execute(
+        select(
+            func.count(Control.id),
+            func.count(Control.id).filter(
+                Control.description != "",
+                Control.description.isnot(None),
+                func.length(Control.description) > 20,
+            ),
+        ).where(Control.framework_id == framework_id)
+    )).one()
 
     pct = round(with_desc / total * 100) if total else 0
     return {
@@ -311,8 +409,40 @@ async def framework_description_stats(
 # ---------------------------------------------------------------------------
 
 
+_CONTROL_OUT_COLUMNS = (
+    Control.id,
+    Control.framework_id,
+    Control.control_id,
+    Control.title,
+    Control.description,
+    Control.category,
+    Framework.short_name,
+)
+
+
+def _control_out_fields(row) -> dict:
+    """ControlOut fields for a row selected with ``_CONTROL_OUT_COLUMNS``."""
+    cid, fw_id, control_id, title, description, category, short_name = row
+    return {
+        "id": cid,
+        "framework_id": fw_id,
+        "control_id": control_id,
+        "title": title or "",
+        "description": description or "",
+        "category": category or "",
+        "framework_short_name": short_name,
+    }
+
+
+def _control_out(row) -> ControlOut:
+    """Build a ControlOut without validation, for routes whose response_model
+    validates the outgoing payload anyway."""
+    return ControlOut.model_construct(**_control_out_fields(row))
+
+
 @app.get("/api/controls", response_model=ControlSearchOut)
 async def search_controls(
+    request: Request,
     q: str = "",
     framework_id: Optional[int] = None,
     limit: int = Query(50, ge=1, le=500),
@@ -325,6 +455,14 @@ async def search_controls(
     match count (independent of limit/offset) so the UI can render proper
     pagination controls.
     """
+    # Only browse pages are cached: free-text queries are client-chosen and
+    # would churn the LRU without ever being hit again.
+    cache_key = None if q else ("controls", framework_id, limit, offset)
+    if cache_key is not None:
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return _conditional_json(request, cached)
+
     base = select(Control).join(Framework, Control.framework_id == Framework.id)
     if framework_id:
         base = base.where(Control.framework_id == framework_id)
@@ -341,9 +479,7 @@ async def search_controls(
     count_stmt = select(func.count()).select_from(base.subquery())
     total = (await session.execute(count_stmt)).scalar_one()
 
-    stmt = select(Control, Framework.short_name).join(
-        Framework, Control.framework_id == Framework.id
-    )
+    stmt = select(*_CONTROL_OUT_COLUMNS).join(Framework, Control.framework_id == Framework.id)
     if framework_id:
         stmt = stmt.where(Control.framework_id == framework_id)
     if q:
@@ -356,7 +492,7 @@ async def search_controls(
             )
         )
         exact_first = case(
-            (func.lower(Control.control_id) == q.lower(), 0),
+            (Control.control_id_lower == q.lower(), 0),
             else_=1,
         )
         stmt = stmt.order_by(exact_first, Control.control_id)
@@ -365,19 +501,16 @@ async def search_controls(
     stmt = stmt.limit(limit).offset(offset)
 
     rows = (await session.execute(stmt)).all()
-    items = [
-        ControlOut(
-            id=c.id,
-            framework_id=c.framework_id,
-            control_id=c.control_id,
-            title=c.title or "",
-            description=c.description or "",
-            category=c.category or "",
-            framework_short_name=sn,
-        )
-        for c, sn in rows
-    ]
-    return ControlSearchOut(total=total, limit=limit, offset=offset, items=items)
+    # _conditional_json bypasses the response_model, so validate here, once.
+    result = ControlSearchOut.model_validate({
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "items": [_control_out_fields(row) for row in rows],
+    })
+    if cache_key is not None:
+        _cache_set(cache_key, result)
+    return _conditional_json(request, result)
 
 
 # ---------------------------------------------------------------------------
@@ -392,67 +525,64 @@ async def get_mappings(
     session: AsyncSession = Depends(get_session),
 ):
     """Return a control and all its mappings. Optionally filter by framework."""
-    stmt = select(Control).where(Control.control_id == control_id)
+    stmt = (
+        select(*_CONTROL_OUT_COLUMNS)
+        .join(Framework, Control.framework_id == Framework.id)
+        .where(Control.control_id == control_id)
+    )
     if framework_id:
         stmt = stmt.where(Control.framework_id == framework_id)
-    source = (await session.execute(stmt)).scalar_one_or_none()
-    if not source:
+    row = (await session.execute(stmt)).one_or_none()
+    if not row:
         raise HTTPException(404, "Control not found")
+    source_out = _control_out(row)
 
-    fw = (await session.execute(
-        select(Framework.short_name).where(Framework.id == source.framework_id)
-    )).scalar_one()
-
-    source_out = ControlOut(
-        id=source.id,
-        framework_id=source.framework_id,
-        control_id=source.control_id,
-        title=source.title or "",
-        description=source.description or "",
-        category=source.category or "",
-        framework_short_name=fw,
-    )
-
-    # Bidirectional: find mappings where this control is source OR target
-    stmt = (
-        select(
-            Control,
-            Framework.short_name,
-            Mapping.id,
-            Mapping.confidence,
-            Mapping.source_type,
-            Mapping.source_document,
-            Mapping.notes,
-            Mapping.implementation_status,
-        )
-        .join(
-            Mapping,
-            or_(
-                and_(Mapping.source_control_id == source.id, Mapping.target_control_id == Control.id),
-                and_(Mapping.target_control_id == source.id, Mapping.source_control_id == Control.id),
-            ),
+    # Bidirectional: one branch per direction so each side is a plain index
+    # probe (an OR in the join condition would defeat both mapping indexes).
+    def _direction(this_side, other_side):
+        return (
+            select(
+                Control.control_id,
+                Control.title,
+                Control.description,
+                Control.category,
+                Control.framework_id,
+                Framework.short_name,
+                Mapping.id,
+                Mapping.confidence,
+                Mapping.source_type,
+                Mapping.source_document,
+                Mapping.notes,
+                Mapping.implementation_status,
+            )
+            .select_from(Mapping)
+            .join(Control, other_side == Control.id)
+            .join(Framework, Control.framework_id == Framework.id)
+            .where(this_side == source_out.id, Control.id != source_out.id)
         )
-        .join(Framework, Control.framework_id == Framework.id)
-        .where(Control.id != source.id)
+
+    stmt = union_all(
+        _direction(Mapping.source_control_id, Mapping.target_control_id),
+        _direction(Mapping.target_control_id, Mapping.source_control_id),
     )
     rows = (await session.execute(stmt)).all()
 
     mappings_out = [
-        MappingOut(
+        MappingOut.model_construct(
             id=mid,
-            control_id=c.control_id,
-            title=c.title or "",
-            description=c.description or "",
-            category=c.category or "",
+            control_id=cid,
+            title=title or "",
+            description=desc or "",
+            category=cat or "",
             framework_short_name=sn,
-            framework_id=c.framework_id,
+            framework_id=fw_id,
             confidence=conf,
             source_type=st,
             source_document=sd or "",
             notes=notes or "",
             implementation_status=impl_status or "not_assessed",
         )
-        for c, sn, mid, conf, st, sd, notes, impl_status in rows
+        for cid, title, desc, cat, fw_id, sn, mid, conf, st, sd, notes, impl_status in rows
     ]
 
     return MappingDetail(source=source_out, mappings=mappings_out)
@@ -463,6 +593,31 @@ async def get_mappings(
 # ---------------------------------------------------------------------------
 
 
+def _mapped_controls_stmt(framework_id: int, other_framework_id: int, *columns):
+    """Controls of ``framework_id`` with a flag telling whether any mapping
+    (in either direction) links them to a control of ``other_framework_id``.
+
+    ``columns`` replaces the default (id, control_id, title) projection; the
+    ``mapped`` flag is always the last column.
+    """
+    other = aliased(Control)
+    has_mapping = (
+        select(Mapping.id)
+        .join(other, or_(
+            and_(Mapping.source_control_id == Control.id, Mapping.target_control_id == other.id),
+            and_(Mapping.target_control_id == Control.id, Mapping.source_control_id == other.id),
+        ))
+        .where(other.framework_id == other_framework_id)
+        .exists()
+    )
+    columns = columns or (Control.id, Control.control_id, Control.title)
+    return (
+        select(*columns, has_mapping.label("mapped"))
+        .where(Control.framework_id == framework_id)
+        .order_by(Control.id)
+    )
+
+
 @app.get("/api/coverage", response_model=CoverageOut)
 async def coverage_analysis(
     source: int = Query(..., description="Source framework ID"),
@@ -470,47 +625,26 @@ async def coverage_analysis(
     session: AsyncSession = Depends(get_session),
 ):
     """Coverage statistics between two frameworks: mapped count, gap count, percentage."""
-    src_fw = (await session.execute(
-        select(Framework).where(Framework.id == source)
-    )).scalar_one_or_none()
-    tgt_fw = (await session.execute(
-        select(Framework).where(Framework.id == target)
-    )).scalar_one_or_none()
+    src_fw, tgt_fw = await _load_frameworks(session, Framework.id, source, target)
     if not src_fw or not tgt_fw:
         raise HTTPException(404, "Framework not found")
 
-    src_controls = (await session.execute(
-        select(Control.id, Control.control_id, Control.title).where(Control.framework_id == source)
-    )).all()
-    tgt_controls = (await session.execute(
-        select(Control.id, Control.control_id, Control.title).where(Control.framework_id == target)
-    )).all()
-
-    src_ids = {r[0] for r in src_controls}
-    src_map = {r[0]: {"id": r[1], "title": r[2] or ""} for r in src_controls}
-    tgt_ids = {r[0] for r in tgt_controls}
-    tgt_map = {r[0]: {"id": r[1], "title": r[2] or ""} for r in tgt_controls}
-
-    mapped_src = set()
-    mapped_tgt = set()
-
-    stmt = select(Mapping.source_control_id, Mapping.target_control_id).where(
-        or_(
-            and_(Mapping.source_control_id.in_(src_ids), Mapping.target_control_id.in_(tgt_ids)),
-            and_(Mapping.target_control_id.in_(src_ids), Mapping.source_control_id.in_(tgt_ids)),
-        )
-    )
-    pairs = (await session.execute(stmt)).all()
-    for s, t in pairs:
-        if s in src_ids:
-            mapped_src.add(s)
-            mapped_tgt.add(t)
+    total = mapped = 0
+    unmapped_ids = []
+    result = await session.stream(_mapped_controls_stmt(source, target))
+    async for _, control_id, title, is_mapped in result:
+        total += 1
+        if is_mapped:
+            mapped += 1
         else:
-            mapped_src.add(t)
-            mapped_tgt.add(s)
+            unmapped_ids.append({"id": control_id, "title": title or ""})
 
-    total = len(src_controls)
-    mapped = len(mapped_src)
+    result = await session.stream(_mapped_controls_stmt(target, source))
+    gap_controls = [
+        {"id": control_id, "title": title or ""}
+        async for _, control_id, title, is_mapped in result
+        if not is_mapped
+    ]
 
     return CoverageOut(
         source_framework=src_fw.short_name,
@@ -519,8 +653,8 @@ async def coverage_analysis(
         mapped_controls=mapped,
         unmapped_controls=total - mapped,
         coverage_percentage=round((mapped / total * 100) if total else 0, 1),
-        unmapped_control_ids=[src_map[i] for i in src_ids if i not in mapped_src],
-        gap_controls=[tgt_map[i] for i in tgt_ids if i not in mapped_tgt],
+        unmapped_control_ids=unmapped_ids,
+        gap_controls=gap_controls,
     )
 
 
@@ -530,8 +664,13 @@ async def version_transitions(
     session: AsyncSession = Depends(get_session),
 ):
     """List available version transitions for a framework."""
+    cache_key = ("transitions", framework_short_name)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     fw = (await session.execute(
-        select(Framework).where(Framework.short_name == framework_short_name)
+        _FRAMEWORK_BY_SHORT_NAME, {"short_name": framework_short_name}
     )).scalar_one_or_none()
     if not fw:
         raise HTTPException(404, "Framework not found")
@@ -547,10 +686,10 @@ async def version_transitions(
         .order_by(VersionChange.old_version)
     )
     rows = (await session.execute(stmt)).all()
-    return [
+    return _cache_set(cache_key, [
         {"old_version": old, "new_version": new, "change_count": cnt}
         for old, new, cnt in rows
-    ]
+    ])
 
 
 @app.get("/api/versions/{framework_short_name}/changes", response_model=list[VersionChangeOut])
@@ -561,21 +700,30 @@ async def version_changes(
     session: AsyncSession = Depends(get_session),
 ):
     fw = (await session.execute(
-        select(Framework).where(Framework.short_name == framework_short_name)
+        _FRAMEWORK_BY_SHORT_NAME, {"short_name": framework_short_name}
     )).scalar_one_or_none()
     if not fw:
         raise HTTPException(404, "Framework not found")
 
-    stmt = select(VersionChange).where(VersionChange.framework_id == fw.id)
+    stmt = select(
+        VersionChange.id,
+        VersionChange.old_version,
+        VersionChange.new_version,
+        VersionChange.change_type,
+        VersionChange.old_control_id,
+        VersionChange.new_control_id,
+        VersionChange.description,
+        VersionChange.category,
+    ).where(VersionChange.framework_id == fw.id)
     if old:
         stmt = stmt.where(VersionChange.old_version == old)
     if new:
         stmt = stmt.where(VersionChange.new_version == new)
     stmt = stmt.order_by(VersionChange.change_type, VersionChange.old_control_id)
 
-    rows = (await session.execute(stmt)).scalars().all()
+    rows = (await session.execute(stmt)).all()
     return [
-        VersionChangeOut(
+        VersionChangeOut.model_construct(
             id=r.id,
             old_version=r.old_version,
             new_version=r.new_version,
@@ -607,94 +755,168 @@ async def add_version_changes(
 ):
     """Bulk-add version change records."""
     fw = (await session.execute(
-        select(Framework).where(Framework.short_name == framework_short_name)
+        _FRAMEWORK_BY_SHORT_NAME, {"short_name": framework_short_name}
     )).scalar_one_or_none()
     if not fw:
         raise HTTPException(404, "Framework not found")
 
-    added = 0
-    for ch in changes:
-        session.add(VersionChange(
-            framework_id=fw.id,
-            old_version=ch.old_version,
-            new_version=ch.new_version,
-            change_type=ch.change_type,
-            old_control_id=ch.old_control_id,
-            new_control_id=ch.new_control_id,
-            description=ch.description,
-            category=ch.category,
-        ))
-        added += 1
+    if changes:
+        await session.execute(insert(VersionChange), [
+            {"framework_id": fw.id, **ch.model_dump()} for ch in changes
+        ])
 
     await session.commit()
-    return {"added": added}
+    invalidate_cache()
+    return {"added": len(changes)}
+
+
+def _coverage_pairs_stmt(source: int, target: int):
+    """Every source control with its mapped target-framework controls, in one query.
+
+    Source controls without a mapping into ``target`` still appear once with
+    NULL target/mapping columns (outer joins), so callers can emit gap rows.
+    Mappings are matched in either direction.
+    """
+    sc = aliased(Control)
+    tc = aliased(Control)
+    return (
+        select(
+            sc.id, sc.control_id, sc.title,
+            tc.id, tc.control_id, tc.title,
+            Mapping.id, Mapping.confidence, Mapping.source_type,
+            Mapping.notes, Mapping.implementation_status,
+        )
+        .select_from(sc)
+        .outerjoin(
+            Mapping,
+            or_(Mapping.source_control_id == sc.id, Mapping.target_control_id == sc.id),
+        )
+        .outerjoin(
+            tc,
+            and_(
+                tc.framework_id == target,
+                or_(
+                    and_(Mapping.source_control_id == sc.id, Mapping.target_control_id == tc.id),
+                    and_(Mapping.target_control_id == sc.id, Mapping.source_control_id == tc.id),
+                ),
+            ),
+        )
+        .where(sc.framework_id == source)
+        .order_by(sc.control_id, sc.id, Mapping.id)
+    )
+
+
+_COVERAGE_TABLE_COLUMNS = (
+    "mapping_id", "source_id", "source_title", "target_id", "target_title",
+    "confidence", "source_type", "notes", "implementation_status",
+)
+
+
+async def _iter_coverage_rows(result):
+    """Turn the rows of ``_coverage_pairs_stmt`` into coverage table dicts.
+
+    Relies on the statement ordering rows by source control, so each source
+    can be closed off (and a gap row emitted) without buffering the table.
+    """
+    current_id = None
+    current = ("", "")
+    has_mapping = False
+
+    def _gap(sc_cid: str, sc_title: str) -> dict:
+        return {
+            "mapping_id": None,
+            "source_id": sc_cid,
+            "source_title": sc_title,
+            "target_id": "",
+            "target_title": "",
+            "confidence": 0,
+            "source_type": "gap",
+            "notes": "",
+            "implementation_status": "not_assessed",
+        }
+
+    async for sc_id, sc_cid, sc_title, tc_id, tc_cid, tc_title, mid, conf, st, notes, impl_status in result:
+        if sc_id != current_id:
+            if current_id is not None and not has_mapping:
+                yield _gap(*current)
+            current_id = sc_id
+            current = (sc_cid, sc_title or "")
+            has_mapping = False
+        if tc_id is None:
+            continue
+        has_mapping = True
+        yield {
+            "mapping_id": mid,
+            "source_id": sc_cid,
+            "source_title": sc_title or "",
+            "target_id": tc_cid,
+            "target_title": tc_title or "",
+            "confidence": conf,
+            "source_type": st,
+            "notes": notes or "",
+            "implementation_status": impl_status or "not_assessed",
+        }
+
+    if current_id is not None and not has_mapping:
+        yield _gap(*current)
 
 
 @app.get("/api/coverage/table")
 async def coverage_table(
     source: int = Query(..., description="Source framework ID"),
     target: int = Query(..., description="Target framework ID"),
+    format: str = Query("json", pattern="^(json|csv|ndjson)$", description="json, csv or ndjson"),
     session: AsyncSession = Depends(get_session),
 ):
-    """Full mapping table between two frameworks (for export/display)."""
-    src_fw = (await session.execute(
-        select(Framework).where(Framework.id == source)
-    )).scalar_one_or_none()
-    tgt_fw = (await session.execute(
-        select(Framework).where(Framework.id == target)
-    )).scalar_one_or_none()
+    """Full mapping table between two frameworks (for export/display).
+
+    ``format=csv`` / ``format=ndjson`` stream the rows instead of building the
+    whole table in memory.
+    """
+    src_fw, tgt_fw = await _load_frameworks(session, Framework.id, source, target)
     if not src_fw or not tgt_fw:
         raise HTTPException(404, "Framework not found")
 
-    src_controls = (await session.execute(
-        select(Control).where(Control.framework_id == source).order_by(Control.control_id)
-    )).scalars().all()
-
-    rows = []
-    for sc in src_controls:
-        mapped = (await session.execute(
-            select(Control, Mapping.id, Mapping.confidence, Mapping.source_type, Mapping.notes, Mapping.implementation_status)
-            .join(
-                Mapping,
-                or_(
-                    and_(Mapping.source_control_id == sc.id, Mapping.target_control_id == Control.id),
-                    and_(Mapping.target_control_id == sc.id, Mapping.source_control_id == Control.id),
-                ),
-            )
-            .where(Control.framework_id == target)
-        )).all()
-
-        if mapped:
-            for tc, mid, conf, st, notes, impl_status in mapped:
-                rows.append({
-                    "mapping_id": mid,
-                    "source_id": sc.control_id,
-                    "source_title": sc.title or "",
-                    "target_id": tc.control_id,
-                    "target_title": tc.title or "",
-                    "confidence": conf,
-                    "source_type": st,
-                    "notes": notes or "",
-                    "implementation_status": impl_status or "not_assessed",
-                })
-        else:
-            rows.append({
-                "mapping_id": None,
-                "source_id": sc.control_id,
-                "source_title": sc.title or "",
-                "target_id": "",
-                "target_title": "",
-                "confidence": 0,
-                "source_type": "gap",
-                "notes": "",
-                "implementation_status": "not_assessed",
-            })
+    stmt = _coverage_pairs_stmt(source, target)
+
+    if format == "json":
+        # No response model here, so encode with orjson directly rather than
+        # going through jsonable_encoder + json.dumps for thousands of rows.
+        result = await session.stream(stmt)
+        return Response(orjson.dumps({
+            "source_framework": src_fw.short_name,
+            "target_framework": tgt_fw.short_name,
+            "rows": [row async for row in _iter_coverage_rows(result)],
+        }), media_type="application/json")
+
+    # The streaming body outlives this handler, so it reads through its own
+    # session on the same engine rather than the request-scoped one.
+    bind = session.bind
+
+    async def _stream():
+        async with AsyncSession(bind, expire_on_commit=False) as stream_session:
+            result = await stream_session.stream(stmt)
+            if format == "csv":
+                buf = StringIO()
+                writer = csv.writer(buf)
+                writer.writerow(_COVERAGE_TABLE_COLUMNS)
+                async for row in _iter_coverage_rows(result):
+                    writer.writerow(row[c] for c in _COVERAGE_TABLE_COLUMNS)
+                    yield buf.getvalue()
+                    buf.seek(0)
+                    buf.truncate()
+                if buf.tell():
+                    yield buf.getvalue()
+            else:
+                async for row in _iter_coverage_rows(result):
+                    yield orjson.dumps(row) + b"\n"
 
-    return {
-        "source_framework": src_fw.short_name,
-        "target_framework": tgt_fw.short_name,
-        "rows": rows,
-    }
+    filename = f"coverage_{src_fw.short_name}_to_{tgt_fw.short_name}.{format}"
+    return StreamingResponse(
+        _stream(),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @app.get("/api/coverage/export")
@@ -707,25 +929,10 @@ async def coverage_export(
     from openpyxl import Workbook
     from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 
-    src_fw = (await session.execute(
-        select(Framework).where(Framework.id == source)
-    )).scalar_one_or_none()
-    tgt_fw = (await session.execute(
-        select(Framework).where(Framework.id == target)
-    )).scalar_one_or_none()
+    src_fw, tgt_fw = await _load_frameworks(session, Framework.id, source, target)
     if not src_fw or not tgt_fw:
         raise HTTPException(404, "Framework not found")
 
-    src_controls = (await session.execute(
-        select(Control).where(Control.framework_id == source).order_by(Control.control_id)
-    )).scalars().all()
-    tgt_controls = (await session.execute(
-        select(Control.id, Control.control_id, Control.title).where(Control.framework_id == target)
-    )).all()
-
-    tgt_ids = {r[0] for r in tgt_controls}
-    tgt_map = {r[0]: {"id": r[1], "title": r[2] or ""} for r in tgt_controls}
-
     def _confidence_band(value: float) -> str:
         if value >= 0.8:
             return "Strong"
@@ -735,40 +942,39 @@ async def coverage_export(
             return "Weak"
         return ""
 
-    table_rows = []
-    mapped_src_ids = set()
-    mapped_tgt_ids = set()
-
-    for sc in src_controls:
-        mapped = (await session.execute(
-            select(Control, Mapping.confidence, Mapping.source_type, Mapping.notes)
-            .join(
-                Mapping,
-                or_(
-                    and_(Mapping.source_control_id == sc.id, Mapping.target_control_id == Control.id),
-                    and_(Mapping.target_control_id == sc.id, Mapping.source_control_id == Control.id),
-                ),
-            )
-            .where(Control.framework_id == target)
-        )).all()
+    src_info: dict[int, tuple[str, str]] = {}
+    grouped: dict[int, list[tuple]] = defaultdict(list)
 
-        if mapped:
-            mapped_src_ids.add(sc.id)
-            for tc, conf, st, notes in mapped:
-                mapped_tgt_ids.add(tc.id)
-                table_rows.append((
-                    sc.control_id, sc.title or "",
-                    tc.control_id, tc.title or "",
-                    st, conf, _confidence_band(conf or 0), notes or "",
-                ))
+    result = await session.execute(_coverage_pairs_stmt(source, target))
+    for sc_id, sc_cid, sc_title, tc_id, tc_cid, tc_title, _mid, conf, st, notes, _impl in result:
+        src_info.setdefault(sc_id, (sc_cid, sc_title or ""))
+        if tc_id is None:
+            continue
+        grouped[sc_id].append((
+            sc_cid, sc_title or "",
+            tc_cid, tc_title or "",
+            st, conf, _confidence_band(conf or 0), notes or "",
+        ))
+
+    table_rows = []
+    unmapped = []
+    for sc_id, (sc_cid, sc_title) in src_info.items():
+        if grouped[sc_id]:
+            table_rows.extend(grouped[sc_id])
         else:
-            table_rows.append((sc.control_id, sc.title or "", "", "", "gap", 0, "", ""))
+            unmapped.append((sc_cid, sc_title))
+            table_rows.append((sc_cid, sc_title, "", "", "gap", 0, "", ""))
 
-    total = len(src_controls)
-    mapped_count = len(mapped_src_ids)
+    total = len(src_info)
+    mapped_count = total - len(unmapped)
     pct = round((mapped_count / total * 100) if total else 0, 1)
-    unmapped = [(sc.control_id, sc.title or "") for sc in src_controls if sc.id not in mapped_src_ids]
-    gap_targets = [(tgt_map[tid]["id"], tgt_map[tid]["title"]) for tid in tgt_ids if tid not in mapped_tgt_ids]
+
+    # Target-side gaps come straight from SQL, like /api/coverage.
+    gap_targets = [
+        (tc_cid, tc_title or "")
+        for _, tc_cid, tc_title, is_mapped in await session.execute(_mapped_controls_stmt(target, source))
+        if not is_mapped
+    ]
 
     wb = Workbook()
     header_font = Font(bold=True, size=11)
@@ -870,7 +1076,8 @@ async def upload_document(
     """Parse an uploaded document and return extracted controls/mappings for review."""
     content = await file.read()
     filename = file.filename or ""
-    result = parse_uploaded_bytes(content, filename, doc_type)
+    # pdfplumber/pandas parsing is CPU-bound; keep it off the event loop.
+    result = await asyncio.to_thread(parse_uploaded_bytes, content, filename, doc_type)
     return ParseResult(**result)
 
 
@@ -886,20 +1093,12 @@ async def import_data(
     session: AsyncSession = Depends(get_session),
 ):
     """Persist parsed controls and mappings from a document upload into the database."""
-    controls_added = 0
-    mappings_added = 0
-
     src_fw_id = body.source_framework_id
     tgt_fw_id = body.target_framework_id
     source_doc = body.source_document or body.doc_type
 
     if src_fw_id and tgt_fw_id:
-        src_fw = (await session.execute(
-            select(Framework).where(Framework.id == src_fw_id)
-        )).scalar_one_or_none()
-        tgt_fw = (await session.execute(
-            select(Framework).where(Framework.id == tgt_fw_id)
-        )).scalar_one_or_none()
+        src_fw, tgt_fw = await _load_frameworks(session, Framework.id, src_fw_id, tgt_fw_id)
     else:
         doc_type = body.doc_type
         if "BSI" in doc_type and "C5" not in doc_type:
@@ -908,81 +1107,87 @@ async def import_data(
             short = "C5"
         else:
             short = "ISO27001"
-        tgt_fw = (await session.execute(
-            select(Framework).where(Framework.short_name == short)
-        )).scalar_one_or_none()
-        src_fw = (await session.execute(
-            select(Framework).where(Framework.short_name == "ISO27001")
-        )).scalar_one_or_none()
+        src_fw, tgt_fw = await _load_frameworks(session, Framework.short_name, "ISO27001", short)
 
     if not src_fw or not tgt_fw:
         return ImportResult(success=False, error="Source or target framework not found.")
 
+    # First occurrence wins for control IDs repeated within the upload.
+    new_controls: dict[str, dict] = {}
     for ctrl in body.controls:
-        existing = (await session.execute(
-            select(Control).where(
-                Control.framework_id == tgt_fw.id,
-                Control.control_id == ctrl["control_id"],
-            )
-        )).scalar_one_or_none()
-        if not existing:
-            session.add(Control(
-                framework_id=tgt_fw.id,
-                control_id=ctrl["control_id"],
-                title=ctrl.get("title", ""),
-                category=ctrl.get("category", ""),
+        new_controls.setdefault(ctrl["control_id"], {
+            "framework_id": tgt_fw.id,
+            "control_id": ctrl["control_id"],
+            "title": ctrl.get("title", ""),
+            "category": ctrl.get("category", ""),
+        })
+    controls_added = 0
+    lookup: dict[tuple[str, int], int] = {}
+    if new_controls:
+        inserted = (await session.execute(
+            insert_ignore(session, Control).returning(Control.id, Control.control_id),
+            list(new_controls.values()),
+        )).all()
+        controls_added = len(inserted)
+        lookup.update({(cid, tgt_fw.id): pk for pk, cid in inserted})
+
+    # Resolve the remaining mapping endpoints with a lookup scoped to the
+    # control IDs this upload references, not the whole controls table.
+    src_wanted = {m["source"] for m in body.mappings if m["source"]}
+    tgt_wanted = {m["target"] for m in body.mappings if m["target"]}
+    tgt_wanted -= {cid for cid, fw_id in lookup if fw_id == tgt_fw.id}
+    if src_wanted or tgt_wanted:
+        rows = (await session.execute(
+            select(Control.id, Control.control_id, Control.framework_id).where(or_(
+                and_(Control.framework_id == src_fw.id, Control.control_id.in_(src_wanted)),
+                and_(Control.framework_id == tgt_fw.id, Control.control_id.in_(tgt_wanted)),
             ))
-            controls_added += 1
-    await session.flush()
-
-    all_controls = (await session.execute(
-        select(Control.id, Control.control_id, Control.framework_id)
-    )).all()
-    lookup = {(r[1], r[2]): r[0] for r in all_controls}
+        )).all()
+        lookup.update({(cid, fw_id): pk for pk, cid, fw_id in rows})
+
+    # Source controls referenced by a mapping but not in the DB yet are
+    # created on the fly (e.g. ISO clauses that are not seeded).
+    missing_sources = list(dict.fromkeys(
+        m["source"] for m in body.mappings
+        if m["source"] and (m["source"], src_fw.id) not in lookup
+    ))
+    if missing_sources:
+        created = (await session.execute(
+            insert_ignore(session, Control).returning(Control.id, Control.control_id),
+            [
+                {"framework_id": src_fw.id, "control_id": cid, "title": cid, "category": ""}
+                for cid in missing_sources
+            ],
+        )).all()
+        lookup.update({(cid, src_fw.id): pk for pk, cid in created})
 
+    pairs = []
     for m in body.mappings:
         s_id = lookup.get((m["source"], src_fw.id))
         t_id = lookup.get((m["target"], tgt_fw.id))
-
-        if not s_id and m["source"]:
-            existing = (await session.execute(
-                select(Control).where(
-                    Control.framework_id == src_fw.id,
-                    Control.control_id == m["source"],
-                )
-            )).scalar_one_or_none()
-            if not existing:
-                ctrl = Control(
-                    framework_id=src_fw.id,
-                    control_id=m["source"],
-                    title=m["source"],
-                    category="",
-                )
-                session.add(ctrl)
-                await session.flush()
-                s_id = ctrl.id
-                lookup[(m["source"], src_fw.id)] = s_id
-            else:
-                s_id = existing.id
-
         if s_id and t_id:
-            existing = (await session.execute(
-                select(Mapping).where(
-                    Mapping.source_control_id == s_id,
-                    Mapping.target_control_id == t_id,
-                )
-            )).scalar_one_or_none()
-            if not existing:
-                session.add(Mapping(
-                    source_control_id=s_id,
-                    target_control_id=t_id,
-                    confidence=1.0,
-                    source_type="official",
-                    source_document=source_doc,
-                ))
-                mappings_added += 1
+            pairs.append((s_id, t_id))
+    pairs = list(dict.fromkeys(pairs))
+
+    mappings_added = 0
+    if pairs:
+        inserted = (await session.execute(
+            insert_ignore(session, Mapping).returning(Mapping.id),
+            [
+                {
+                    "source_control_id": s_id,
+                    "target_control_id": t_id,
+                    "confidence": 1.0,
+                    "source_type": "official",
+                    "source_document": source_doc,
+                }
+                for s_id, t_id in pairs
+            ],
+        )).all()
+        mappings_added = len(inserted)
 
     await session.commit()
+    invalidate_cache()
     return ImportResult(success=True, controls_added=controls_added, mappings_added=mappings_added)
 
 
@@ -1029,13 +1234,12 @@ async def create_mapping(
     if body.source_control_id == body.target_control_id:
         raise HTTPException(400, "Source and target control must differ.")
 
-    src = (await session.execute(
-        select(Control).where(Control.id == body.source_control_id)
-    )).scalar_one_or_none()
-    tgt = (await session.execute(
-        select(Control).where(Control.id == body.target_control_id)
-    )).scalar_one_or_none()
-    if not src or not tgt:
+    found = (await session.execute(
+        select(func.count(Control.id)).where(
+            Control.id.in_([body.source_control_id, body.target_control_id])
+        )
+    )).scalar_one()
+    if found != 2:
         raise HTTPException(404, "Source or target control not found.")
 
     # Reject duplicates in either direction.
@@ -1180,7 +1384,7 @@ async def upload_regulation(
 
     # Create or get Framework for this regulation
     existing_fw = (await session.execute(
-        select(Framework).where(Framework.short_name == body.short_name)
+        _FRAMEWORK_BY_SHORT_NAME, {"short_name": body.short_name}
     )).scalar_one_or_none()
 
     if not existing_fw:
@@ -1197,35 +1401,27 @@ async def upload_regulation(
     else:
         fw_id = existing_fw.id
 
-    # Extract statements and create Controls
+    # Extract statements and create Controls in one batched insert;
+    # statements already stored for this framework are skipped by the DB.
     statements = _split_into_statements(body.full_text)
-    controls_created = 0
+    new_controls = []
     for idx, stmt in enumerate(statements, 1):
         stmt = stmt.strip()
         if len(stmt) < 15:
             continue
-        control_id = f"{body.short_name}-S{idx:03d}"
-
-        existing_ctrl = (await session.execute(
-            select(Control).where(
-                Control.framework_id == fw_id,
-                Control.control_id == control_id,
-            )
-        )).scalar_one_or_none()
-
-        if not existing_ctrl:
-            # Use first 100 chars as title, full statement as description
-            title = stmt[:100] + ("..." if len(stmt) > 100 else "")
-            session.add(Control(
-                framework_id=fw_id,
-                control_id=control_id,
-                title=title,
-                description=stmt,
-                category="regulation",
-            ))
-            controls_created += 1
+        # Use first 100 chars as title, full statement as description
+        new_controls.append({
+            "framework_id": fw_id,
+            "control_id": f"{body.short_name}-S{idx:03d}",
+            "title": stmt[:100] + ("..." if len(stmt) > 100 else ""),
+            "description": stmt,
+            "category": "regulation",
+        })
+    if new_controls:
+        await session.execute(insert_ignore(session, Control), new_controls)
 
     await session.commit()
+    invalidate_cache()
     await session.refresh(doc)
     return RegulationOut(
         id=doc.id, name=doc.name, short_name=doc.short_name,
@@ -1298,31 +1494,57 @@ async def extract_regulation_tuples(
 @app.get("/api/regulations/{reg_id}/tuples")
 async def get_regulation_tuples(
     reg_id: int,
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    offset: int = Query(0, ge=0),
     session: AsyncSession = Depends(get_session),
 ):
-    """List extracted ARC tuples for a regulation."""
+    """List extracted ARC tuples for a regulation.
+
+    Without ``limit`` every tuple from ``offset`` on is returned. ``count``
+    always reports the regulation's total, not the size of the page.
+    """
     from database import RegulationDocument, ArcTuple
 
     doc = (await session.execute(
-        select(RegulationDocument).where(RegulationDocument.id == reg_id)
+        select(RegulationDocument.id).where(RegulationDocument.id == reg_id)
     )).scalar_one_or_none()
     if not doc:
         raise HTTPException(404, "Regulation not found")
 
-    stmt = select(ArcTuple).where(ArcTuple.regulation_id == reg_id)
-    rows = (await session.execute(stmt)).scalars().all()
+    stmt = (
+        select(
+            ArcTuple.id,
+            ArcTuple.tuple_type,
+            ArcTuple.verb,
+            ArcTuple.deontic_modal,
+            ArcTuple.source_statement,
+        )
+        .where(ArcTuple.regulation_id == reg_id)
+        .order_by(ArcTuple.id)
+        .offset(offset)
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    rows = (await session.execute(stmt)).all()
 
-    tuples = []
-    for r in rows:
-        tuples.append({
-            "id": r.id,
-            "tuple_type": r.tuple_type,
-            "verb": r.verb,
-            "deontic_modal": r.deontic_modal,
-            "source_statement": r.source_statement,
-        })
+    tuples = [
+        {
+            "id": tid,
+            "tuple_type": tuple_type,
+            "verb": verb,
+            "deontic_modal": modal,
+            "source_statement": statement,
+        }
+        for tid, tuple_type, verb, modal, statement in rows
+    ]
 
-    return {"regulation_id": reg_id, "tuples": tuples, "count": len(tuples)}
+    if limit is None and offset == 0:
+        count = len(tuples)
+    else:
+        count = (await session.execute(
+            select(func.count(ArcTuple.id)).where(ArcTuple.regulation_id == reg_id)
+        )).scalar_one()
+    return {"regulation_id": reg_id, "tuples": tuples, "count": count}
 
 
 @app.post("/api/compliance/check")
@@ -1474,8 +1696,6 @@ async def generate_framework_mappings(
     the text-based Generate Mappings produces, but works directly from DB controls
     so you don't need to paste thousands of lines of text.
     """
-    import asyncio
-
     src_controls = (await session.execute(
         select(Control).where(Control.framework_id == body.source_framework_id)
     )).scalars().all()
@@ -1487,12 +1707,9 @@ async def generate_framework_mappings(
     if not src_controls or not tgt_controls:
         raise HTTPException(400, "One or both frameworks have no controls in the database.")
 
-    src_fw = (await session.execute(
-        select(Framework).where(Framework.id == body.source_framework_id)
-    )).scalar_one_or_none()
-    tgt_fw = (await session.execute(
-        select(Framework).where(Framework.id == body.target_framework_id)
-    )).scalar_one_or_none()
+    src_fw, tgt_fw = await _load_frameworks(
+        session, Framework.id, body.source_framework_id, body.target_framework_id
+    )
 
     def _build_text(ctrl) -> str:
         parts = [ctrl.control_id, ctrl.title or ""]
@@ -1633,61 +1850,50 @@ async def generate_regulation_mappings(
 
     # Persist mappings into the existing mappings table
     # Find frameworks for both regulations
-    src_fw = (await session.execute(
-        select(Framework).where(Framework.short_name == doc1.short_name)
-    )).scalar_one_or_none()
-    tgt_fw = (await session.execute(
-        select(Framework).where(Framework.short_name == doc2.short_name)
-    )).scalar_one_or_none()
+    src_fw, tgt_fw = await _load_frameworks(session, Framework.short_name, doc1.short_name, doc2.short_name)
 
     persisted_count = 0
     if src_fw and tgt_fw:
-        # Load all controls for both frameworks
-        src_controls = (await session.execute(
-            select(Control).where(Control.framework_id == src_fw.id)
-        )).scalars().all()
-        tgt_controls = (await session.execute(
-            select(Control).where(Control.framework_id == tgt_fw.id)
-        )).scalars().all()
-
-        # Index by description for matching
-        src_by_desc = {c.description: c for c in src_controls if c.description}
-        tgt_by_desc = {c.description: c for c in tgt_controls if c.description}
+        # Index both frameworks' controls by description for matching
+        rows = (await session.execute(
+            select(Control.id, Control.framework_id, Control.description).where(
+                Control.framework_id.in_([src_fw.id, tgt_fw.id])
+            )
+        )).all()
+        src_by_desc = {d: cid for cid, fw_id, d in rows if d and fw_id == src_fw.id}
+        tgt_by_desc = {d: cid for cid, fw_id, d in rows if d and fw_id == tgt_fw.id}
+
+        # Existing mappings between the two frameworks, fetched once and
+        # stored in both directions so either orientation counts as a duplicate.
+        src_ctrl = aliased(Control)
+        tgt_ctrl = aliased(Control)
+        pair_rows = (await session.execute(
+            select(Mapping.source_control_id, Mapping.target_control_id)
+            .join(src_ctrl, Mapping.source_control_id == src_ctrl.id)
+            .join(tgt_ctrl, Mapping.target_control_id == tgt_ctrl.id)
+            .where(or_(
+                and_(src_ctrl.framework_id == src_fw.id, tgt_ctrl.framework_id == tgt_fw.id),
+                and_(src_ctrl.framework_id == tgt_fw.id, tgt_ctrl.framework_id == src_fw.id),
+            ))
+        )).all()
+        existing = {(s, t) for s, t in pair_rows} | {(t, s) for s, t in pair_rows}
 
         for suggestion in suggestions:
-            src_stmt = suggestion["source_statement"]
-            tgt_stmt = suggestion["target_statement"]
-
-            src_ctrl = src_by_desc.get(src_stmt)
-            tgt_ctrl = tgt_by_desc.get(tgt_stmt)
-
-            if src_ctrl and tgt_ctrl:
-                # Check if mapping already exists
-                existing = (await session.execute(
-                    select(Mapping).where(
-                        or_(
-                            and_(
-                                Mapping.source_control_id == src_ctrl.id,
-                                Mapping.target_control_id == tgt_ctrl.id,
-                            ),
-                            and_(
-                                Mapping.source_control_id == tgt_ctrl.id,
-                                Mapping.target_control_id == src_ctrl.id,
-                            ),
-                        )
-                    )
-                )).scalar_one_or_none()
-
-                if not existing:
-                    session.add(Mapping(
-                        source_control_id=src_ctrl.id,
-                        target_control_id=tgt_ctrl.id,
-                        confidence=suggestion["confidence"],
-                        source_type="ai_suggested",
-                        source_document=suggestion["source_document"],
-                        notes=suggestion["notes"],
-                    ))
-                    persisted_count += 1
+            src_id = src_by_desc.get(suggestion["source_statement"])
+            tgt_id = tgt_by_desc.get(suggestion["target_statement"])
+            if not src_id or not tgt_id or (src_id, tgt_id) in existing:
+                continue
+            session.add(Mapping(
+                source_control_id=src_id,
+                target_control_id=tgt_id,
+                confidence=suggestion["confidence"],
+                source_type="ai_suggested",
+                source_document=suggestion["source_document"],
+                notes=suggestion["notes"],
+            ))
+            existing.add((src_id, tgt_id))
+            existing.add((tgt_id, src_id))
+            persisted_count += 1
 
         await session.commit()
 
@@ -1732,8 +1938,8 @@ async def suggest_mappings(
     Returns empty results until embeddings are generated by the AI module.
     """
     source = (await session.execute(
-        select(Control).where(Control.control_id == control_id)
-    )).scalar_one_or_none()
+        select(Control.id, Control.embedding).where(Control.control_id == control_id)
+    )).one_or_none()
     if not source:
         raise HTTPException(404, "Source control not found")
 
@@ -1785,6 +1991,26 @@ async def suggest_mappings(
 # Text Extraction (PDF / DOCX / TXT upload)
 # ---------------------------------------------------------------------------
 
+def _pdf_to_text(content: bytes) -> str:
+    import pdfplumber
+    text_parts = []
+    with pdfplumber.open(BytesIO(content)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            # Drop the page's parsed layout objects right away; otherwise
+            # pdfplumber keeps every page's objects alive until the end.
+            page.close()
+            if page_text:
+                text_parts.append(page_text)
+    return "\n\n".join(text_parts)
+
+
+def _docx_to_text(content: bytes) -> str:
+    from docx import Document as DocxDocument
+    doc = DocxDocument(BytesIO(content))
+    return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+
+
 @app.post("/api/extract-text")
 async def extract_text(file: UploadFile = File(...)):
     """Extract plain text from an uploaded PDF, DOCX, or TXT file.
@@ -1802,24 +2028,14 @@ async def extract_text(file: UploadFile = File(...)):
             text = content.decode("latin-1")
 
     elif filename.endswith(".pdf"):
-        import io
-        import pdfplumber
-        text_parts = []
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
-        text = "\n\n".join(text_parts)
+        text = await asyncio.to_thread(_pdf_to_text, content)
 
     elif filename.endswith(".docx"):
-        import io
         try:
-            from docx import Document as DocxDocument
+            from docx import Document as DocxDocument  # noqa: F401
         except ImportError:
             raise HTTPException(status_code=500, detail="python-docx not installed")
-        doc = DocxDocument(io.BytesIO(content))
-        text = "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+        text = await asyncio.to_thread(_docx_to_text, content)
 
     else:
         raise HTTPException(
@@ -1859,41 +2075,11 @@ async def check_policy_against_gaps(
        rule-based otherwise).
     4. Aggregates per-control: covered / possibly_covered / not_covered.
     """
-    import asyncio
-
-    src_controls = (await session.execute(
-        select(Control).where(Control.framework_id == body.source_framework_id)
-    )).scalars().all()
-
-    tgt_control_ids = set((await session.execute(
-        select(Control.id).where(Control.framework_id == body.target_framework_id)
-    )).scalars().all())
-
-    src_id_set = {c.id for c in src_controls}
-    mapped_src: set[int] = set()
-
-    if src_id_set and tgt_control_ids:
-        pairs = (await session.execute(
-            select(Mapping.source_control_id, Mapping.target_control_id).where(
-                or_(
-                    and_(
-                        Mapping.source_control_id.in_(src_id_set),
-                        Mapping.target_control_id.in_(tgt_control_ids),
-                    ),
-                    and_(
-                        Mapping.target_control_id.in_(src_id_set),
-                        Mapping.source_control_id.in_(tgt_control_ids),
-                    ),
-                )
-            )
-        )).all()
-        for s, t in pairs:
-            if s in src_id_set:
-                mapped_src.add(s)
-            else:
-                mapped_src.add(t)
-
-    unmapped = [c for c in src_controls if c.id not in mapped_src]
+    rows = (await session.execute(_mapped_controls_stmt(
+        body.source_framework_id, body.target_framework_id,
+        Control.id, Control.control_id, Control.title, Control.description,
+    ))).all()
+    unmapped = [row for row in rows if not row.mapped]
 
     if not unmapped or not body.policy_text.strip():
         return {
@@ -2046,16 +2232,14 @@ async def check_policy_against_gaps(
     if results is None:
         results = []
 
-    covered = sum(1 for r in results if r["coverage"] == "covered")
-    possibly = sum(1 for r in results if r["coverage"] == "possibly_covered")
-    not_covered = sum(1 for r in results if r["coverage"] == "not_covered")
+    by_coverage = Counter(r["coverage"] for r in results)
 
     return {
         "unmapped_count": len(unmapped),
         "checked_count": len(results),
-        "covered_count": covered,
-        "possibly_covered_count": possibly,
-        "not_covered_count": not_covered,
+        "covered_count": by_coverage["covered"],
+        "possibly_covered_count": by_coverage["possibly_covered"],
+        "not_covered_count": by_coverage["not_covered"],
         "results": results,
     }
 
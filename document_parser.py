@@ -8,14 +8,31 @@ To add a new format:
 That's it. The upload API picks it up automatically.
 """
 
+import os
 import re
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from io import BytesIO
+from itertools import repeat
 from dataclasses import dataclass, field
 from typing import Callable, Protocol
 
 import pandas as pd
 import pdfplumber
 
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    import python_calamine  # noqa: F401  (Rust reader behind pandas' "calamine" engine)
+    _EXCEL_ENGINE = "calamine"
+except ImportError:
+    _EXCEL_ENGINE = None  # pandas default (openpyxl)
+
 
 # ---------------------------------------------------------------------------
 # Output type — every parser returns this
@@ -114,15 +131,106 @@ def parse_uploaded_bytes(content: bytes, filename: str, doc_type: str) -> dict:
 # ===========================================================================
 
 
+# ---------------------------------------------------------------------------
+# PDF text extraction
+# ---------------------------------------------------------------------------
+
+# Worker processes for page extraction (0 or 1 = always extract serially).
+PDF_PARSE_WORKERS = int(os.environ.get("PDF_PARSE_WORKERS") or os.cpu_count() or 1)
+# Each worker gets at least this many pages; smaller PDFs are read serially.
+_MIN_PAGES_PER_WORKER = 16
+
+_PDF_POOL: ProcessPoolExecutor | None = None
+_PDF_POOL_LOCK = threading.Lock()
+
+
+def _file_like(content: bytes | os.PathLike):
+    """Wrap raw bytes for the readers; paths go through as-is so they read from disk lazily."""
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return BytesIO(content)
+    return content
+
+
+def _fitz_open(content: bytes | os.PathLike):
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=content, filetype="pdf")
+    return fitz.open(content, filetype="pdf")
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _PDF_POOL
+    # Uploads parse in to_thread workers; the lock keeps two first uploads
+    # from each starting (and one leaking) a pool.
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            # spawn: the API process runs threads, which fork does not mix well with.
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=PDF_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _PDF_POOL
+
+
+def _pdf_page_count(content: bytes | os.PathLike) -> int:
+    if fitz is not None:
+        with _fitz_open(content) as doc:
+            return doc.page_count
+    with pdfplumber.open(_file_like(content)) as pdf:
+        return len(pdf.pages)
+
+
+def _pdf_page_range_texts(content: bytes | os.PathLike, start: int, stop: int) -> list[str]:
+    """Plain text of pages ``start`` to ``stop - 1`` (zero-based)."""
+    if fitz is not None:
+        with _fitz_open(content) as doc:
+            return [doc[i].get_text("text", sort=True) for i in range(start, stop)]
+    texts = []
+    with pdfplumber.open(_file_like(content), pages=range(start + 1, stop + 1)) as pdf:
+        for page in pdf.pages:
+            texts.append(page.extract_text() or "")
+            # Free the page's parsed layout objects now rather than holding
+            # every page's until the document is closed.
+            page.close()
+    return texts
+
+
+def _pdf_page_texts(content: bytes | os.PathLike) -> list[str]:
+    """Return the plain text of every page in a PDF.
+
+    Uses PyMuPDF when installed (MuPDF's C engine is many times faster than
+    pdfminer) and falls back to pdfplumber otherwise. Long documents are split
+    into contiguous page ranges that are extracted in worker processes.
+    """
+    n_pages = _pdf_page_count(content)
+    workers = min(PDF_PARSE_WORKERS, n_pages // _MIN_PAGES_PER_WORKER)
+    if workers < 2:
+        return _pdf_page_range_texts(content, 0, n_pages)
+
+    step = -(-n_pages // workers)
+    starts = range(0, n_pages, step)
+    stops = [min(start + step, n_pages) for start in starts]
+    chunks = _get_pdf_pool().map(_pdf_page_range_texts, repeat(content), starts, stops)
+    return [text for chunk in chunks for text in chunk]
+
+
 # ---------------------------------------------------------------------------
 # BSI Zuordnungstabelle PDF
 # ---------------------------------------------------------------------------
 
 _ISO_PATTERN = re.compile(r"A\.(\d+)\.(\d+)")
-_BSI_REQ_PATTERN = re.compile(r"\b([A-Z]{2,5}\.\d+(?:\.\d+)?\.A\d+)\b")
-_BSI_MODULE_PATTERN = re.compile(r"\b([A-Z]{2,5}\.\d+(?:\.\d+)?)\b")
-_BSI_STD_PATTERN = re.compile(r"(BSI-Standard\s+200-[1-4])")
+_BSI_STD_REF_PATTERN = re.compile(r"BSI-Standard\s+200-(?P<std>[1-4])|(?P<elem>Elementare\s+Gef)")
 _CLAUSE_START = re.compile(r"^(\d+(?:\.\d+)*)\s+[A-Z]")
+_SUBCLAUSE_PATTERN = re.compile(r"^\d+\.\d+")
+_ANNEX_LINE = re.compile(r"^\s*A\.", re.M)
+# One alternation for every token of the Annex A section, so the text is
+# scanned once; the group that matched is m.lastgroup.
+_ANNEX_TOKEN = re.compile(
+    r"(?P<iso>A\.\d+\.\d+)(?=\s)"
+    r"|\b(?P<req>[A-Z]{2,5}\.\d+(?:\.\d+)?\.A\d+)\b"
+    r"|\b(?P<mod>[A-Z]{2,5}\.\d+(?:\.\d+)?)\b"
+    r"|BSI-Standard\s+200-(?P<std>[1-4])"
+    r"|(?P<elem>Elementare\s+Gef)"
+)
 
 _BSI_MODULE_PREFIXES = {
     "ISMS", "ORP", "CON", "OPS", "APP", "SYS", "IND", "INF", "DER", "NET", "TNA",
@@ -137,7 +245,7 @@ _BSI_STD_TITLES = {
 }
 
 
-def _parse_bsi_zuordnung_pdf(content: bytes, doc_type: str) -> ParseOutput:
+def _parse_bsi_zuordnung_pdf(content: bytes | os.PathLike, doc_type: str) -> ParseOutput:
     """
     Parse BSI Zuordnungstabelle PDF.
     Handles both:
@@ -146,23 +254,17 @@ def _parse_bsi_zuordnung_pdf(content: bytes, doc_type: str) -> ParseOutput:
     """
     controls: list[dict] = []
     mappings: list[dict] = []
-    all_text: list[str] = []
     seen_bsi: set[str] = set()
     seen_mappings: set[tuple] = set()
 
-    with pdfplumber.open(BytesIO(content)) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
-            all_text.append(text)
-
-    full_text = "\n".join(all_text)
+    full_text = "\n".join(_pdf_page_texts(content))
 
     def _add_bsi(bsi_ctrl: str, iso_ctrl: str, title: str = "", category: str = ""):
         if bsi_ctrl not in seen_bsi:
             seen_bsi.add(bsi_ctrl)
             if not category:
-                cat = re.match(r"([A-Z]+)", bsi_ctrl)
-                category = cat.group(1) if cat else ""
+                # Requirement IDs matched [A-Z]{2,5}\. so the prefix is the category.
+                category = bsi_ctrl.split(".", 1)[0]
             controls.append({
                 "control_id": bsi_ctrl,
                 "title": title or f"BSI {bsi_ctrl}",
@@ -175,16 +277,16 @@ def _parse_bsi_zuordnung_pdf(content: bytes, doc_type: str) -> ParseOutput:
 
     def _extract_std_refs(text_block: str) -> list[str]:
         refs = []
-        for m in _BSI_STD_PATTERN.finditer(text_block):
-            raw = m.group(1)
-            num = re.search(r"200-([1-4])", raw)
-            if num:
-                ctrl_id = f"BSI-Std-200-{num.group(1)}"
-                if ctrl_id not in refs:
-                    refs.append(ctrl_id)
-        if re.search(r"Elementare\s+Gef", text_block):
-            if "BSI-ElemGef" not in refs:
-                refs.append("BSI-ElemGef")
+        elem_gef = False
+        for m in _BSI_STD_REF_PATTERN.finditer(text_block):
+            if m.lastgroup == "elem":
+                elem_gef = True
+                continue
+            ctrl_id = f"BSI-Std-200-{m.group('std')}"
+            if ctrl_id not in refs:
+                refs.append(ctrl_id)
+        if elem_gef:
+            refs.append("BSI-ElemGef")
         return refs
 
     for ctrl_id, title in _BSI_STD_TITLES.items():
@@ -196,8 +298,10 @@ def _parse_bsi_zuordnung_pdf(content: bytes, doc_type: str) -> ParseOutput:
                 "category": "BSI-Standard",
             })
 
-    # Pass 1: Clause section (ISO clauses 1-10 -> BSI-Standards)
-    lines = full_text.split("\n")
+    # Pass 1: Clause section (ISO clauses 1-10 -> BSI-Standards), which ends
+    # at the first line starting with "A.".
+    annex_start = _ANNEX_LINE.search(full_text)
+    head = full_text[:annex_start.start()] if annex_start else full_text
     current_clause = None
     clause_buffer: list[str] = []
 
@@ -210,20 +314,16 @@ def _parse_bsi_zuordnung_pdf(content: bytes, doc_type: str) -> ParseOutput:
                          _BSI_STD_TITLES.get(std_id, std_id), "BSI-Standard")
         clause_buffer = []
 
-    for line in lines:
+    for line in head.split("\n"):
         stripped = line.strip()
         if not stripped:
             continue
-        if stripped.startswith("A."):
-            _flush_clause()
-            current_clause = None
-            break
 
         clause_match = _CLAUSE_START.match(stripped)
         if clause_match:
             _flush_clause()
             clause_num = clause_match.group(1)
-            if re.match(r"^\d+\.\d+", clause_num):
+            if _SUBCLAUSE_PATTERN.match(clause_num):
                 current_clause = clause_num
             clause_buffer = [stripped]
         elif current_clause:
@@ -231,42 +331,74 @@ def _parse_bsi_zuordnung_pdf(content: bytes, doc_type: str) -> ParseOutput:
 
     _flush_clause()
 
-    # Pass 2: Annex A section (A.X.Y -> IT-Grundschutz requirements)
-    sections = re.split(r"(A\.\d+\.\d+\s)", full_text)
+    # Pass 2: Annex A section (A.X.Y -> IT-Grundschutz requirements), in one
+    # scan over the text. Tokens are attributed to the most recent A.X.Y
+    # anywhere in the text; requirement IDs are additionally attributed to the
+    # most recent A.X.Y that opens a line, and those line-based mappings are
+    # appended after the section-based ones.
     current_iso = None
-    for section in sections:
-        m = re.match(r"A\.(\d+)\.(\d+)\s*$", section.strip())
-        if m:
-            current_iso = f"A.{m.group(1)}.{m.group(2)}"
-            continue
-        if current_iso and section.strip():
-            for bsi_ctrl in _BSI_REQ_PATTERN.findall(section):
+    line_iso = None
+    section_reqs: list[str] = []
+    section_mods: list[str] = []
+    section_stds: list[str] = []
+    section_elem_gef = False
+    line_mappings: list[tuple[str, str]] = []
+
+    def _flush_section():
+        nonlocal section_elem_gef
+        if section_elem_gef:
+            section_stds.append("BSI-ElemGef")
+        if current_iso:
+            for bsi_ctrl in section_reqs:
                 _add_bsi(bsi_ctrl, current_iso)
-            for bsi_mod in _BSI_MODULE_PATTERN.findall(section):
-                prefix = bsi_mod.split(".")[0]
-                if ".A" not in bsi_mod and prefix in _BSI_MODULE_PREFIXES and bsi_mod not in seen_bsi:
+            for bsi_mod in section_mods:
+                prefix = bsi_mod.split(".", 1)[0]
+                if prefix in _BSI_MODULE_PREFIXES and bsi_mod not in seen_bsi:
                     seen_bsi.add(bsi_mod)
-                    cat = re.match(r"([A-Z]+)", bsi_mod)
                     controls.append({
                         "control_id": bsi_mod,
                         "title": f"BSI Module {bsi_mod}",
-                        "category": cat.group(1) if cat else "",
+                        "category": prefix,
                     })
-            for std_id in _extract_std_refs(section):
+            for std_id in section_stds:
                 _add_bsi(std_id, current_iso,
                          _BSI_STD_TITLES.get(std_id, std_id), "BSI-Standard")
-
-    # Line-by-line fallback for requirement IDs
-    current_iso = None
-    for line in full_text.split("\n"):
-        iso_start = re.match(r"^A\.(\d+)\.(\d+)\s+(.+)", line)
-        if iso_start:
-            current_iso = f"A.{iso_start.group(1)}.{iso_start.group(2)}"
-            for bsi_ctrl in _BSI_REQ_PATTERN.findall(iso_start.group(3)):
-                _add_bsi(bsi_ctrl, current_iso)
-        elif current_iso:
-            for bsi_ctrl in _BSI_REQ_PATTERN.findall(line):
-                _add_bsi(bsi_ctrl, current_iso)
+        section_reqs.clear()
+        section_mods.clear()
+        section_stds.clear()
+        section_elem_gef = False
+
+    for m in _ANNEX_TOKEN.finditer(full_text):
+        kind = m.lastgroup
+        if kind == "iso":
+            _flush_section()
+            current_iso = m.group("iso")
+            pos, end = m.start(), m.end()
+            if pos == 0 or full_text[pos - 1] == "\n":
+                line_end = full_text.find("\n", end)
+                if line_end == -1:
+                    line_end = len(full_text)
+                if line_end - end >= 2:
+                    line_iso = current_iso
+        elif kind == "req":
+            bsi_ctrl = m.group("req")
+            section_reqs.append(bsi_ctrl)
+            # The module ID the requirement belongs to (APP.1.1.A3 -> APP.1.1).
+            section_mods.append(bsi_ctrl[:bsi_ctrl.rindex(".A")])
+            if line_iso:
+                line_mappings.append((bsi_ctrl, line_iso))
+        elif kind == "mod":
+            section_mods.append(m.group("mod"))
+        elif kind == "std":
+            std_id = f"BSI-Std-200-{m.group('std')}"
+            if std_id not in section_stds:
+                section_stds.append(std_id)
+        else:
+            section_elem_gef = True
+    _flush_section()
+
+    for bsi_ctrl, iso_ctrl in line_mappings:
+        _add_bsi(bsi_ctrl, iso_ctrl)
 
     return ParseOutput(
         success=True,
@@ -281,44 +413,54 @@ def _parse_bsi_zuordnung_pdf(content: bytes, doc_type: str) -> ParseOutput:
 # ---------------------------------------------------------------------------
 
 _C5_REF_PATTERN = re.compile(r"([A-Z]{2,4})-(\d{2})")
+# Stripped cell values that count as empty (pandas writes NaN as "nan").
+_EMPTY_CELLS = frozenset({"", "nan"})
 _ISO_ANNEX_PATTERN = re.compile(r"(A\.\d+\.\d+)")
 _ISO_CLAUSE_PATTERN = re.compile(r"(\d+\.\d+)")
+# Anchored category prefixes for Series.str.extract, which searches rather
+# than matches.
+_C5_PREFIX_PATTERN = re.compile(r"^([A-Z]{2,4})-\d{2}")
+_CATEGORY_PREFIX_PATTERN = re.compile(r"^([A-Z]+)")
+
 
+def _merge_iso_refs(annex: list[str], clauses: list[str]) -> list[str]:
+    """Combine a cell's Annex A and clause matches into its ISO 27001 references.
 
-def _extract_iso_refs(raw: str) -> list[str]:
-    """Extract ISO 27001 references from a cell (handles ranges, dashes, etc)."""
-    if not raw or raw.strip() in ("-", "n/a", "nan", ""):
-        return []
-    refs: list[str] = []
-    refs.extend(_ISO_ANNEX_PATTERN.findall(raw))
-    for clause in _ISO_CLAUSE_PATTERN.findall(raw):
+    Clause matches already contained in an Annex A reference (the "5.1" in
+    "A.5.1") are dropped.
+    """
+    refs = list(annex)
+    for clause in clauses:
         if clause not in refs and not any(clause in r for r in refs):
             refs.append(clause)
     return refs
 
 
-def _parse_excel(content: bytes, doc_type: str) -> ParseOutput:
+def _parse_excel(content: bytes | os.PathLike, doc_type: str) -> ParseOutput:
     """Parse Excel for controls and mappings. Handles C5:2020 format."""
-    controls: list[dict] = []
-    mappings: list[dict] = []
-    seen_mappings: set[tuple] = set()
-
-    xlsx = pd.ExcelFile(BytesIO(content))
-
-    target_sheets = [s for s in xlsx.sheet_names if "map" in s.lower() or "reference" in s.lower()]
-    if not target_sheets:
-        target_sheets = xlsx.sheet_names
-
-    for sheet_name in target_sheets:
-        df_raw = pd.read_excel(xlsx, sheet_name=sheet_name, header=None)
-        if df_raw.empty or len(df_raw) < 3:
-            continue
-
-        header_row = _find_header_row(df_raw)
-        if header_row is None:
-            continue
+    parts: list[pd.DataFrame] = []
+
+    # One ExcelFile handle for every sheet read, closed when parsing is done.
+    with pd.ExcelFile(_file_like(content), engine=_EXCEL_ENGINE) as xlsx:
+        sheet_names = xlsx.sheet_names
+        target_sheets = [s for s in sheet_names if "map" in s.lower() or "reference" in s.lower()]
+        if not target_sheets:
+            target_sheets = sheet_names
+        sheets = []
+        for sheet_name in target_sheets:
+            df_raw = xlsx.parse(sheet_name, header=None)
+            if df_raw.empty or len(df_raw) < 3:
+                continue
+            header_row = _find_header_row(df_raw)
+            if header_row is None:
+                continue
+            # Slice the header and body out of the raw read instead of parsing
+            # the sheet a second time with header=header_row.
+            df = df_raw.iloc[header_row + 1:].reset_index(drop=True)
+            df.columns = df_raw.iloc[header_row].tolist()
+            sheets.append(df)
 
-        df = pd.read_excel(xlsx, sheet_name=sheet_name, header=header_row)
+    for df in sheets:
         seen_cols: dict[str, int] = {}
         new_cols = []
         for c in df.columns:
@@ -331,83 +473,85 @@ def _parse_excel(content: bytes, doc_type: str) -> ParseOutput:
                 new_cols.append(name)
         df.columns = new_cols
 
-        col_map = _detect_columns(df.columns, doc_type)
+        col_map = _detect_columns(tuple(df.columns), doc_type)
         if not col_map:
             continue
 
-        ref_col = col_map["ref"]
-        title_col = col_map.get("title")
-        desc_col = col_map.get("description")
-        iso_col = col_map["iso"]
-
-        for _, row in df.iterrows():
-            ref_val = _safe_str(row, ref_col)
-            iso_val = _safe_str(row, iso_col)
-            title_val = _safe_str(row, title_col) if title_col else ""
-            desc_val = _safe_str(row, desc_col) if desc_col else ""
-
-            if not ref_val or ref_val == "nan":
-                continue
-
-            if "C5" in doc_type or _C5_REF_PATTERN.match(ref_val):
-                ctrl_id = ref_val
-                cat_match = _C5_REF_PATTERN.match(ref_val)
-                category = cat_match.group(1) if cat_match else ""
-            else:
-                ctrl_id = ref_val
-                cat_match = re.match(r"([A-Z]+)", ref_val)
-                category = cat_match.group(1) if cat_match else ""
-
-            if not any(c["control_id"] == ctrl_id for c in controls):
-                controls.append({
-                    "control_id": ctrl_id,
-                    "title": title_val or f"Control {ctrl_id}",
-                    "description": desc_val,
-                    "category": category,
-                })
-
-            iso_refs = _extract_iso_refs(iso_val)
-            for iso_ref in iso_refs:
-                key = (iso_ref, ctrl_id)
-                if key not in seen_mappings:
-                    seen_mappings.add(key)
-                    mappings.append({"source": iso_ref, "target": ctrl_id})
+        iso_cells = df[col_map["iso"]].astype("string").fillna("")
+        part = pd.DataFrame({
+            "control_id": _str_column(df, col_map["ref"]),
+            "title": _str_column(df, col_map.get("title")),
+            "description": _str_column(df, col_map.get("description")),
+            "iso_refs": [
+                _merge_iso_refs(annex, clauses)
+                for annex, clauses in zip(
+                    iso_cells.str.findall(_ISO_ANNEX_PATTERN),
+                    iso_cells.str.findall(_ISO_CLAUSE_PATTERN),
+                )
+            ],
+        })
+        parts.append(part[~part["control_id"].isin(_EMPTY_CELLS)])
+
+    # Assemble every sheet's rows column-wise, then dedupe controls and
+    # mappings in one hashed pass each (first occurrence wins).
+    controls: list[dict] = []
+    mappings: list[dict] = []
+    if parts:
+        rows = pd.concat(parts, ignore_index=True)
+        ids = rows["control_id"]
+        category = ids.str.extract(_C5_PREFIX_PATTERN, expand=False)
+        if "C5" not in doc_type:
+            category = category.fillna(ids.str.extract(_CATEGORY_PREFIX_PATTERN, expand=False))
+        rows["category"] = category.fillna("")
+        rows["title"] = rows["title"].mask(rows["title"] == "", "Control " + ids)
+
+        controls = (
+            rows.drop_duplicates("control_id")
+            [["control_id", "title", "description", "category"]]
+            .to_dict("records")
+        )
+        mappings = (
+            rows[["iso_refs", "control_id"]]
+            .explode("iso_refs")
+            .dropna()
+            .drop_duplicates()
+            .rename(columns={"iso_refs": "source", "control_id": "target"})
+            .to_dict("records")
+        )
 
     return ParseOutput(
         success=True,
         controls=controls,
         mappings=mappings,
-        raw_text=f"Parsed {len(xlsx.sheet_names)} sheets, {len(controls)} controls, {len(mappings)} mappings",
+        raw_text=f"Parsed {len(sheet_names)} sheets, {len(controls)} controls, {len(mappings)} mappings",
     )
 
 
-def _safe_str(row, col) -> str:
+def _str_column(df: pd.DataFrame, col: str | None) -> pd.Series:
+    """Stripped string values of a column, with missing cells as ""."""
     if col is None:
-        return ""
-    val = row.get(col)
-    if val is None:
-        return ""
-    if isinstance(val, pd.Series):
-        val = val.iloc[0]
-    if pd.isna(val):
-        return ""
-    return str(val).strip()
+        return pd.Series("", index=df.index, dtype="string")
+    return df[col].astype("string").str.strip().fillna("")
+
+
+_HEADER_KEYWORDS = ("ref", "title", "criteria", "description")
 
 
 def _find_header_row(df: pd.DataFrame, max_rows: int = 5) -> int | None:
-    keywords = ("ref", "title", "criteria", "description")
-    best_row = None
-    best_score = 0
-    for i in range(min(max_rows, len(df))):
-        row_values = [str(v).strip().lower() for v in df.iloc[i] if pd.notna(v)]
-        score = sum(1 for val in row_values for kw in keywords if kw in val)
-        if score > best_score:
-            best_score = score
-            best_row = i
-    return best_row if best_score >= 2 else None
-
-
-def _detect_columns(columns: list[str], doc_type: str) -> dict | None:
+    # One (row, column) entry per cell; a cell scores once per keyword it contains.
+    cells = df.head(max_rows).reset_index(drop=True).astype("string").stack().str.lower()
+    if cells.empty:
+        return None
+    hits = sum(cells.str.contains(kw, regex=False, na=False) for kw in _HEADER_KEYWORDS)
+    scores = hits.groupby(level=0).sum()
+    best_row = scores.idxmax()
+    return int(best_row) if scores[best_row] >= 2 else None
+
+
+@lru_cache(maxsize=128)
+def _detect_columns(columns: tuple[str, ...], doc_type: str) -> dict | None:
+    # Cached per header shape (uploads of the same standard repeat it); the
+    # returned dict is shared between calls and must not be modified.
     result: dict = {}
     ref_count = 0
 
@@ -444,41 +588,48 @@ def _detect_columns(columns: list[str], doc_type: str) -> dict | None:
 # CSV parser (simple source/target columns)
 # ---------------------------------------------------------------------------
 
-def _parse_csv(content: bytes, doc_type: str) -> ParseOutput:
+def _parse_csv(content: bytes | os.PathLike, doc_type: str) -> ParseOutput:
     """Parse a CSV with source/target columns for mappings."""
-    df = pd.read_csv(BytesIO(content))
+    columns = pd.read_csv(_file_like(content), nrows=0).columns
     controls: list[dict] = []
     mappings: list[dict] = []
 
     iso_col = None
     target_col = None
 
-    for col in df.columns:
+    for col in columns:
         col_upper = str(col).upper()
         if "ISO" in col_upper or "27001" in col_upper or "SOURCE" in col_upper:
             iso_col = col
         elif "BSI" in col_upper or "C5" in col_upper or "TARGET" in col_upper:
             target_col = col
 
-    if iso_col and target_col:
-        for _, row in df.iterrows():
-            iso_val = str(row[iso_col]).strip() if pd.notna(row[iso_col]) else ""
-            target_val = str(row[target_col]).strip() if pd.notna(row[target_col]) else ""
+    # Only the two mapping columns are converted, and as plain strings, so
+    # IDs like "6.10" are not mangled by float inference. Without both, one
+    # column is still read for the row count.
+    df = pd.read_csv(
+        _file_like(content),
+        usecols=[iso_col, target_col] if iso_col and target_col else list(columns[:1]),
+        dtype=str,
+    )
 
-            if iso_val and target_val and iso_val != "nan" and target_val != "nan":
-                mappings.append({"source": iso_val, "target": target_val})
-                if not any(c["control_id"] == target_val for c in controls):
-                    controls.append({
-                        "control_id": target_val,
-                        "title": f"Control {target_val}",
-                        "category": "",
-                    })
+    if iso_col and target_col:
+        pairs = pd.DataFrame({
+            "source": df[iso_col].str.strip(),
+            "target": df[target_col].str.strip(),
+        }).dropna()
+        pairs = pairs[~pairs.isin(_EMPTY_CELLS).any(axis=1)]
+        mappings = pairs.to_dict("records")
+        controls = [
+            {"control_id": target, "title": f"Control {target}", "category": ""}
+            for target in pairs["target"].drop_duplicates()
+        ]
 
     return ParseOutput(
         success=True,
         controls=controls,
         mappings=mappings,
-        raw_text=f"Parsed {len(df)} rows, columns: {list(df.columns)}",
+        raw_text=f"Parsed {len(df)} rows, columns: {list(columns)}",
     )
 
 
@@ -489,6 +640,7 @@ def _parse_csv(content: bytes, doc_type: str) -> ParseOutput:
 _C5_CRITERION_PATTERN = re.compile(
     r"\b([A-Z]{2,4}-\d{2})\b"
 )
+_C5_LINE_START = re.compile(r"^([A-Z]{2,4}-\d{2})\s+(.*)")
 _C5_DOMAINS = {
     "OIS": "Organisation of Information Security",
     "AM": "Asset Management",
@@ -508,7 +660,7 @@ _C5_DOMAINS = {
 }
 
 
-def _parse_c5_pdf(content: bytes, doc_type: str) -> ParseOutput:
+def _parse_c5_pdf(content: bytes | os.PathLike, doc_type: str) -> ParseOutput:
     """Parse BSI C5:2020 standalone PDF.
 
     Extracts criteria IDs (OIS-01, AM-01, …) with titles and descriptions
@@ -521,9 +673,18 @@ def _parse_c5_pdf(content: bytes, doc_type: str) -> ParseOutput:
     seen_mappings: set[tuple] = set()
     all_text_parts: list[str] = []
 
-    with pdfplumber.open(BytesIO(content)) as pdf:
+    with pdfplumber.open(_file_like(content)) as pdf:
         for page in pdf.pages:
-            # Try table extraction first (C5 uses tables)
+            text = page.extract_text() or ""
+            all_text_parts.append(text)
+            # Table rows only yield a control when a cell holds a criterion ID,
+            # so skip the costly table detection on pages without one (cover,
+            # contents, glossary).
+            if not _C5_CRITERION_PATTERN.search(text):
+                page.close()
+                continue
+
+            # C5 uses tables; the page text above is the fallback
             tables = page.extract_tables() or []
             for table in tables:
                 for row in table:
@@ -549,8 +710,7 @@ def _parse_c5_pdf(content: bytes, doc_type: str) -> ParseOutput:
 
                     if ctrl_id and ctrl_id not in seen_ids:
                         seen_ids.add(ctrl_id)
-                        cat_match = re.match(r"([A-Z]+)", ctrl_id)
-                        domain_prefix = cat_match.group(1) if cat_match else ""
+                        domain_prefix = ctrl_id.split("-", 1)[0]
                         controls.append({
                             "control_id": ctrl_id,
                             "title": title or f"C5 {ctrl_id}",
@@ -563,9 +723,7 @@ def _parse_c5_pdf(content: bytes, doc_type: str) -> ParseOutput:
                                 seen_mappings.add(key)
                                 mappings.append({"source": iso_ref, "target": ctrl_id})
 
-            # Also grab raw text for text-based fallback
-            text = page.extract_text() or ""
-            all_text_parts.append(text)
+            page.close()
 
     # Text-based fallback if tables yielded nothing
     if not controls:
@@ -579,13 +737,12 @@ def _parse_c5_pdf(content: bytes, doc_type: str) -> ParseOutput:
             line = line.strip()
             if not line:
                 continue
-            m = re.match(r"^([A-Z]{2,4}-\d{2})\s+(.*)", line)
+            m = _C5_LINE_START.match(line)
             if m:
                 # Save previous
                 if current_id and current_id not in seen_ids:
                     seen_ids.add(current_id)
-                    cat_match = re.match(r"([A-Z]+)", current_id)
-                    domain_prefix = cat_match.group(1) if cat_match else ""
+                    domain_prefix = current_id.split("-", 1)[0]
                     controls.append({
                         "control_id": current_id,
                         "title": current_title,
@@ -605,8 +762,7 @@ def _parse_c5_pdf(content: bytes, doc_type: str) -> ParseOutput:
                 current_desc_lines.append(line)
 
         if current_id and current_id not in seen_ids:
-            cat_match = re.match(r"([A-Z]+)", current_id)
-            domain_prefix = cat_match.group(1) if cat_match else ""
+            domain_prefix = current_id.split("-", 1)[0]
             controls.append({
                 "control_id": current_id,
                 "title": current_title,
@@ -630,16 +786,20 @@ def _parse_c5_pdf(content: bytes, doc_type: str) -> ParseOutput:
 _BSI_MODULE_ID_RE = re.compile(
     r"^([A-Z]{2,5}\.\d+(?:\.\d+)?)\s+(.+)"
 )
+# Possessive whitespace runs and a title that ends on a non-space character
+# keep matching linear in long runs of layout spaces; with plain \s+/\s* the
+# title, role and level parts could split a run in every possible way.
 _BSI_REQUIREMENT_RE = re.compile(
-    r"^([A-Z]{2,5}\.\d+(?:\.\d+)?\.A\d+)\s+(.+?)(?:\s+\[.+?\])?\s*\(([BSH])\)\s*$"
+    r"^([A-Z]{2,5}\.\d+(?:\.\d+)?\.A\d+)\s++((?:.*?\S)?)(?:\s++\[.+?\])?\s*+\(([BSH])\)\s*+$"
 )
 _BSI_REQUIREMENT_LOOSE = re.compile(
     r"([A-Z]{2,5}\.\d+(?:\.\d+)?\.A\d+)\s+([^\n]{5,120})"
 )
+_SECTION_HEADING = re.compile(r"^\d+(\.\d+)*\s+[A-Z]")
 _PROTECTION_LEVEL = {"B": "Basic", "S": "Standard", "H": "High"}
 
 
-def _parse_bsi_module_pdf(content: bytes, doc_type: str) -> ParseOutput:
+def _parse_bsi_module_pdf(content: bytes | os.PathLike, doc_type: str) -> ParseOutput:
     """Parse a BSI IT-Grundschutz Kompendium module PDF (individual module file).
 
     Extracts requirements (APP.1.1.A1 …) with titles, protection levels (B/S/H),
@@ -647,14 +807,8 @@ def _parse_bsi_module_pdf(content: bytes, doc_type: str) -> ParseOutput:
     """
     controls: list[dict] = []
     seen_ids: set[str] = set()
-    all_text_parts: list[str] = []
-
-    with pdfplumber.open(BytesIO(content)) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
-            all_text_parts.append(text)
 
-    full_text = "\n".join(all_text_parts)
+    full_text = "\n".join(_pdf_page_texts(content))
     lines = full_text.split("\n")
 
     module_id = ""
@@ -712,7 +866,7 @@ def _parse_bsi_module_pdf(content: bytes, doc_type: str) -> ParseOutput:
 
         if current_req_id:
             # Stop accumulating description when hitting the next section header
-            if re.match(r"^\d+(\.\d+)*\s+[A-Z]", stripped) and len(stripped) < 60:
+            if _SECTION_HEADING.match(stripped) and len(stripped) < 60:
                 _flush_req()
                 current_req_id = None
                 current_desc_lines = []
@@ -774,13 +928,13 @@ register_parser(
 # Legacy aliases (so existing imports still work)
 # ---------------------------------------------------------------------------
 
-def parse_bsi_zuordnung_pdf(content: bytes, doc_type: str) -> dict:
+def parse_bsi_zuordnung_pdf(content: bytes | os.PathLike, doc_type: str) -> dict:
     return _parse_bsi_zuordnung_pdf(content, doc_type).to_dict()
 
 
-def parse_excel(content: bytes, doc_type: str) -> dict:
+def parse_excel(content: bytes | os.PathLike, doc_type: str) -> dict:
     return _parse_excel(content, doc_type).to_dict()
 
 
-def parse_csv(content: bytes, doc_type: str) -> dict:
+def parse_csv(content: bytes | os.PathLike, doc_type: str) -> dict:
     return _parse_csv(content, doc_type).to_dict()
@@ -7,7 +7,7 @@ and the official BSI cross-reference table to ISO 27001:2022.
 """
 
 import sys
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from database import init_db_sync, SyncSession, Framework, Control, Mapping
 
 # ---------------------------------------------------------------------------
@@ -237,25 +237,22 @@ def run():
 
         # Seed BSI controls
         print(f"Seeding {len(BSI_CONTROLS)} BSI IT-Grundschutz controls...")
-        bsi_added = 0
+        existing = set(session.execute(
+            select(Control.control_id).where(Control.framework_id == bsi_fw.id)
+        ).scalars())
+        new_controls = []
         for ctrl_id, title, category, description in BSI_CONTROLS:
-            existing = session.execute(
-                select(Control).where(
-                    Control.framework_id == bsi_fw.id,
-                    Control.control_id == ctrl_id,
-                )
-            ).scalar_one_or_none()
-            if not existing:
-                session.add(Control(
-                    framework_id=bsi_fw.id,
-                    control_id=ctrl_id,
-                    title=title,
-                    description=description,
-                    category=category,
-                ))
-                bsi_added += 1
-        session.flush()
-        print(f"  BSI controls added: {bsi_added}")
+            if ctrl_id not in existing:
+                new_controls.append({
+                    "framework_id": bsi_fw.id,
+                    "control_id": ctrl_id,
+                    "title": title,
+                    "description": description,
+                    "category": category,
+                })
+        if new_controls:
+            session.execute(insert(Control), new_controls)
+        print(f"  BSI controls added: {len(new_controls)}")
 
         # Build lookup
         all_controls = session.execute(
@@ -265,30 +262,34 @@ def run():
 
         # Seed ISO ↔ BSI mappings
         print(f"Seeding {len(ISO_BSI_MAPPINGS)} ISO 27001 ↔ BSI mappings...")
-        map_added = 0
+        pairs = []
         for iso_id, bsi_id in ISO_BSI_MAPPINGS:
             src = lookup.get((iso_id, iso_fw.id))
             tgt = lookup.get((bsi_id, bsi_fw.id))
-            if not src or not tgt:
-                continue
-            existing = session.execute(
-                select(Mapping).where(
-                    Mapping.source_control_id == src,
-                    Mapping.target_control_id == tgt,
-                )
-            ).scalar_one_or_none()
-            if not existing:
-                session.add(Mapping(
-                    source_control_id=src,
-                    target_control_id=tgt,
-                    confidence=1.0,
-                    source_type="official",
-                    source_document="BSI-Standard 200-2 / ISO 27001:2022 cross-reference",
-                ))
-                map_added += 1
+            if src and tgt:
+                pairs.append((src, tgt))
+        existing_pairs = set(session.execute(
+            select(Mapping.source_control_id, Mapping.target_control_id).where(
+                Mapping.source_control_id.in_({src for src, _ in pairs}),
+                Mapping.target_control_id.in_({tgt for _, tgt in pairs}),
+            )
+        ).tuples())
+        new_mappings = []
+        for src, tgt in pairs:
+            if (src, tgt) not in existing_pairs:
+                existing_pairs.add((src, tgt))
+                new_mappings.append({
+                    "source_control_id": src,
+                    "target_control_id": tgt,
+                    "confidence": 1.0,
+                    "source_type": "official",
+                    "source_document": "BSI-Standard 200-2 / ISO 27001:2022 cross-reference",
+                })
+        if new_mappings:
+            session.execute(insert(Mapping), new_mappings)
 
         session.commit()
-        print(f"  Mappings added: {map_added}")
+        print(f"  Mappings added: {len(new_mappings)}")
         print("Done! BSI controls and ISO↔BSI mappings are ready.")
 
     except Exception as e:
@@ -6,7 +6,7 @@ and the official C5-to-ISO 27001:2022 cross-reference.
 """
 
 import sys
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from database import init_db_sync, SyncSession, Framework, Control, Mapping
 
 # ---------------------------------------------------------------------------
@@ -556,49 +556,53 @@ def run():
 
         # Seed C5 controls
         print(f"Seeding {len(C5_CONTROLS)} C5:2020 controls...")
-        c5_added = 0
+        c5_existing = {
+            ctrl.control_id: ctrl
+            for ctrl in session.execute(
+                select(Control).where(Control.framework_id == c5_fw.id)
+            ).scalars()
+        }
+        new_controls = []
         c5_updated = 0
         for ctrl_id, title, category, description in C5_CONTROLS:
-            existing = session.execute(
-                select(Control).where(
-                    Control.framework_id == c5_fw.id,
-                    Control.control_id == ctrl_id,
-                )
-            ).scalar_one_or_none()
+            existing = c5_existing.get(ctrl_id)
             if existing:
                 if existing.description != description or existing.title != title:
                     existing.description = description
                     existing.title = title
                     c5_updated += 1
             else:
-                session.add(Control(
-                    framework_id=c5_fw.id,
-                    control_id=ctrl_id,
-                    title=title,
-                    description=description,
-                    category=category,
-                ))
-                c5_added += 1
-        session.flush()
-        print(f"  C5 controls added: {c5_added}, updated: {c5_updated}")
+                new_controls.append({
+                    "framework_id": c5_fw.id,
+                    "control_id": ctrl_id,
+                    "title": title,
+                    "description": description,
+                    "category": category,
+                })
+        if new_controls:
+            session.execute(insert(Control), new_controls)
+        print(f"  C5 controls added: {len(new_controls)}, updated: {c5_updated}")
 
         # Update ISO 27001 descriptions
         print(f"Updating {len(ISO_DESCRIPTIONS)} ISO 27001 control descriptions...")
-        iso_updated = 0
-        for ctrl_id, description in ISO_DESCRIPTIONS.items():
-            existing = session.execute(
+        iso_existing = {
+            ctrl.control_id: ctrl
+            for ctrl in session.execute(
                 select(Control).where(
                     Control.framework_id == iso_fw.id,
-                    Control.control_id == ctrl_id,
+                    Control.control_id.in_(list(ISO_DESCRIPTIONS)),
                 )
-            ).scalar_one_or_none()
+            ).scalars()
+        }
+        iso_updated = 0
+        for ctrl_id, description in ISO_DESCRIPTIONS.items():
+            existing = iso_existing.get(ctrl_id)
             if existing:
                 if existing.description != description:
                     existing.description = description
                     iso_updated += 1
             else:
                 print(f"  WARNING: ISO control {ctrl_id} not found in database, skipping.")
-        session.flush()
         print(f"  ISO descriptions updated: {iso_updated}")
 
         # Build lookup for mappings
@@ -609,7 +613,7 @@ def run():
 
         # Seed C5 to ISO mappings
         print(f"Seeding {len(C5_ISO_MAPPINGS)} C5 to ISO 27001 mappings...")
-        map_added = 0
+        pairs = []
         map_skipped = 0
         for c5_id, iso_id in C5_ISO_MAPPINGS:
             src = lookup.get((c5_id, c5_fw.id))
@@ -617,24 +621,29 @@ def run():
             if not src or not tgt:
                 map_skipped += 1
                 continue
-            existing = session.execute(
-                select(Mapping).where(
-                    Mapping.source_control_id == src,
-                    Mapping.target_control_id == tgt,
-                )
-            ).scalar_one_or_none()
-            if not existing:
-                session.add(Mapping(
-                    source_control_id=src,
-                    target_control_id=tgt,
-                    confidence=1.0,
-                    source_type="official",
-                    source_document="BSI C5:2020 / ISO 27001:2022 cross-reference",
-                ))
-                map_added += 1
+            pairs.append((src, tgt))
+        existing_pairs = set(session.execute(
+            select(Mapping.source_control_id, Mapping.target_control_id).where(
+                Mapping.source_control_id.in_({src for src, _ in pairs}),
+                Mapping.target_control_id.in_({tgt for _, tgt in pairs}),
+            )
+        ).tuples())
+        new_mappings = []
+        for src, tgt in pairs:
+            if (src, tgt) not in existing_pairs:
+                existing_pairs.add((src, tgt))
+                new_mappings.append({
+                    "source_control_id": src,
+                    "target_control_id": tgt,
+                    "confidence": 1.0,
+                    "source_type": "official",
+                    "source_document": "BSI C5:2020 / ISO 27001:2022 cross-reference",
+                })
+        if new_mappings:
+            session.execute(insert(Mapping), new_mappings)
 
         session.commit()
-        print(f"  Mappings added: {map_added}, skipped (missing controls): {map_skipped}")
+        print(f"  Mappings added: {len(new_mappings)}, skipped (missing controls): {map_skipped}")
         print("Done! C5 controls, ISO descriptions, and C5-ISO mappings are ready.")
 
     except Exception as e:
@@ -9,11 +9,13 @@ Place files in ./data/ or pass explicit paths.
 """
 
 import argparse
+import io
 import sys
 from pathlib import Path
+from types import MappingProxyType
 
-from sqlalchemy import select
-from database import init_db_sync, SyncSession, Framework, Control, Mapping
+from sqlalchemy import String, and_, column, or_, select, text, update, values
+from database import init_db_sync, insert_ignore, SyncSession, Framework, Control, Mapping
 from document_parser import parse_bsi_zuordnung_pdf, parse_excel
 
 
@@ -43,7 +45,7 @@ FRAMEWORKS = [
 ]
 
 # ISO 27001:2022 Annex A controls for seeding
-ISO_27001_CONTROLS = [
+ISO_27001_CONTROLS = (
     ("A.5.1", "Policies for information security", "Organizational"),
     ("A.5.2", "Information security roles and responsibilities", "Organizational"),
     ("A.5.3", "Segregation of duties", "Organizational"),
@@ -137,10 +139,10 @@ ISO_27001_CONTROLS = [
     ("A.8.32", "Change management", "Technological"),
     ("A.8.33", "Test information", "Technological"),
     ("A.8.34", "Protection of information systems during audit testing", "Technological"),
-]
+)
 
 
-ISO_27001_CLAUSES = {
+ISO_27001_CLAUSES = MappingProxyType({
     "4.1": "Understanding the organization and its context",
     "4.2": "Understanding the needs and expectations of interested parties",
     "4.3": "Determining the scope of the ISMS",
@@ -164,46 +166,96 @@ ISO_27001_CLAUSES = {
     "9.3": "Management review",
     "10.1": "Continual improvement",
     "10.2": "Nonconformity and corrective action",
-}
+})
+
+
+# Below this many rows a multi-row INSERT is about as fast as COPY.
+_COPY_MIN_ROWS = 100
+
+
+def _copy_csv_field(value) -> str:
+    """Format one value for ``COPY ... WITH (FORMAT csv, NULL '\\N')``.
+
+    Strings are always quoted, so only the unquoted ``\\N`` written for None is
+    read back as NULL; an empty string stays an empty string.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+
+def _bulk_insert(session, model, rows: list[dict]) -> int:
+    """Insert ``rows`` into ``model``'s table, skipping unique conflicts; returns rows added.
+
+    Large batches on PostgreSQL are COPYed into a temporary staging table and
+    moved over with ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``. COPY
+    skips SQLAlchemy entirely, so Python-side column defaults (e.g.
+    Mapping.implementation_status) are filled in here.
+    """
+    if not rows:
+        return 0
+    table = model.__table__
+    if len(rows) < _COPY_MIN_ROWS or session.bind.dialect.name != "postgresql":
+        return len(session.execute(
+            insert_ignore(session, model).returning(*table.primary_key.columns), rows
+        ).all())
+
+    defaults = {
+        c.name: c.default.arg
+        for c in table.columns
+        if c.default is not None and c.default.is_scalar
+    }
+    columns = [c.name for c in table.columns if c.name in rows[0] or c.name in defaults]
+    column_list = ", ".join(columns)
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(",".join(_copy_csv_field(row.get(name, defaults.get(name))) for name in columns))
+        buf.write("\n")
+    buf.seek(0)
+
+    staging = f"_stage_{table.name}"
+    cursor = session.connection().connection.cursor()
+    try:
+        # Only the copied columns and no defaults: a LIKE copy would carry the
+        # id column's nextval() and burn a sequence value per staged row.
+        cursor.execute(
+            f"CREATE TEMP TABLE {staging} AS SELECT {column_list} FROM {table.name} WITH NO DATA"
+        )
+        cursor.copy_expert(
+            f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf
+        )
+        cursor.execute(
+            f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM {staging} "
+            "ON CONFLICT DO NOTHING"
+        )
+        added = cursor.rowcount
+        cursor.execute(f"DROP TABLE {staging}")
+    finally:
+        cursor.close()
+    return added
 
 
 def seed_frameworks(session) -> dict[str, int]:
     """Create or update framework records. Returns short_name -> id map."""
-    fw_map = {}
-    for fw_def in FRAMEWORKS:
-        existing = session.execute(
-            select(Framework).where(Framework.short_name == fw_def["short_name"])
-        ).scalar_one_or_none()
-        if existing:
-            fw_map[fw_def["short_name"]] = existing.id
-        else:
-            fw = Framework(**fw_def)
-            session.add(fw)
-            session.flush()
-            fw_map[fw_def["short_name"]] = fw.id
-            print(f"  Created framework: {fw_def['name']}")
-    return fw_map
+    created = session.execute(
+        insert_ignore(session, Framework).returning(Framework.short_name), FRAMEWORKS
+    ).scalars().all()
+    by_short_name = {fw_def["short_name"]: fw_def for fw_def in FRAMEWORKS}
+    for short_name in created:
+        print(f"  Created framework: {by_short_name[short_name]['name']}")
+    return dict(session.execute(
+        select(Framework.short_name, Framework.id).where(Framework.short_name.in_(by_short_name))
+    ).tuples().all())
 
 
 def seed_iso_controls(session, fw_id: int):
     """Seed ISO 27001:2022 Annex A controls."""
-    added = 0
-    for ctrl_id, title, category in ISO_27001_CONTROLS:
-        existing = session.execute(
-            select(Control).where(
-                Control.framework_id == fw_id,
-                Control.control_id == ctrl_id,
-            )
-        ).scalar_one_or_none()
-        if not existing:
-            session.add(Control(
-                framework_id=fw_id,
-                control_id=ctrl_id,
-                title=title,
-                category=category,
-            ))
-            added += 1
-    session.flush()
+    added = _bulk_insert(session, Control, [
+        {"framework_id": fw_id, "control_id": ctrl_id, "title": title, "category": category}
+        for ctrl_id, title, category in ISO_27001_CONTROLS
+    ])
     print(f"  ISO 27001 controls: {added} added")
 
 
@@ -213,82 +265,73 @@ def ingest_document(session, parse_result: dict, target_fw_id: int, iso_fw_id: i
         print(f"  Parse failed: {parse_result.get('error')}")
         return
 
-    controls_added = 0
-    mappings_added = 0
-
-    # Add controls to target framework
+    # Add controls to target framework; first occurrence wins for repeated IDs
+    new_controls: dict[str, dict] = {}
     for ctrl in parse_result.get("controls", []):
-        existing = session.execute(
-            select(Control).where(
-                Control.framework_id == target_fw_id,
-                Control.control_id == ctrl["control_id"],
-            )
-        ).scalar_one_or_none()
-        if not existing:
-            session.add(Control(
-                framework_id=target_fw_id,
-                control_id=ctrl["control_id"],
-                title=ctrl.get("title", ""),
-                description=ctrl.get("description", ""),
-                category=ctrl.get("category", ""),
-            ))
-            controls_added += 1
-    session.flush()
-
-    # Build lookup: (control_id, framework_id) -> db id
-    all_controls = session.execute(
-        select(Control.id, Control.control_id, Control.framework_id)
-    ).all()
-    lookup = {(r[1], r[2]): r[0] for r in all_controls}
-
-    # Add mappings
-    for m in parse_result.get("mappings", []):
-        src_id = lookup.get((m["source"], iso_fw_id))
-        tgt_id = lookup.get((m["target"], target_fw_id))
-
-        # If the ISO control doesn't exist yet, create it
-        if not src_id and m["source"]:
-            existing = session.execute(
-                select(Control).where(
-                    Control.framework_id == iso_fw_id,
-                    Control.control_id == m["source"],
-                )
-            ).scalar_one_or_none()
-            if not existing:
-                clause_title = ISO_27001_CLAUSES.get(
-                    m["source"], f"ISO {m['source']}"
-                )
-                ctrl = Control(
-                    framework_id=iso_fw_id,
-                    control_id=m["source"],
-                    title=clause_title,
-                    category="Clause" if not m["source"].startswith("A.") else "Annex A",
-                )
-                session.add(ctrl)
-                session.flush()
-                src_id = ctrl.id
-                lookup[(m["source"], iso_fw_id)] = src_id
-            else:
-                src_id = existing.id
-
-        if src_id and tgt_id:
-            existing = session.execute(
-                select(Mapping).where(
-                    Mapping.source_control_id == src_id,
-                    Mapping.target_control_id == tgt_id,
-                )
-            ).scalar_one_or_none()
-            if not existing:
-                session.add(Mapping(
-                    source_control_id=src_id,
-                    target_control_id=tgt_id,
-                    confidence=1.0,
-                    source_type="official",
-                    source_document=source_doc,
+        new_controls.setdefault(ctrl["control_id"], {
+            "framework_id": target_fw_id,
+            "control_id": ctrl["control_id"],
+            "title": ctrl.get("title", ""),
+            "description": ctrl.get("description", ""),
+            "category": ctrl.get("category", ""),
+        })
+    controls_added = _bulk_insert(session, Control, list(new_controls.values()))
+
+    # Build lookup: (control_id, framework_id) -> db id, only for the controls
+    # the mappings reference; uq_framework_control serves as the index.
+    mappings = parse_result.get("mappings", [])
+    src_wanted = {m["source"] for m in mappings if m["source"]}
+    tgt_wanted = {m["target"] for m in mappings if m["target"]}
+    lookup = {}
+    if src_wanted or tgt_wanted:
+        lookup = {
+            (ctrl_id, fw_id): db_id
+            for db_id, ctrl_id, fw_id in session.execute(
+                select(Control.id, Control.control_id, Control.framework_id)
+                .where(or_(
+                    and_(Control.framework_id == iso_fw_id, Control.control_id.in_(src_wanted)),
+                    and_(Control.framework_id == target_fw_id, Control.control_id.in_(tgt_wanted)),
                 ))
-                mappings_added += 1
-
-    session.flush()
+                .execution_options(yield_per=1000)
+            )
+        }
+
+    # Create any ISO controls the mappings reference but the database lacks
+    missing_sources = list(dict.fromkeys(
+        m["source"] for m in mappings
+        if m["source"] and (m["source"], iso_fw_id) not in lookup
+    ))
+    if missing_sources:
+        for db_id, ctrl_id in session.execute(
+            insert_ignore(session, Control).returning(Control.id, Control.control_id),
+            [
+                {
+                    "framework_id": iso_fw_id,
+                    "control_id": ctrl_id,
+                    "title": ISO_27001_CLAUSES.get(ctrl_id, f"ISO {ctrl_id}"),
+                    "category": "Clause" if not ctrl_id.startswith("A.") else "Annex A",
+                }
+                for ctrl_id in missing_sources
+            ],
+        ):
+            lookup[(ctrl_id, iso_fw_id)] = db_id
+
+    # Existing pairs are skipped by the uq_mapping_pair constraint
+    pairs = dict.fromkeys(
+        (lookup[(m["source"], iso_fw_id)], lookup[(m["target"], target_fw_id)])
+        for m in mappings
+        if (m["source"], iso_fw_id) in lookup and (m["target"], target_fw_id) in lookup
+    )
+    mappings_added = _bulk_insert(session, Mapping, [
+        {
+            "source_control_id": src_id,
+            "target_control_id": tgt_id,
+            "confidence": 1.0,
+            "source_type": "official",
+            "source_document": source_doc,
+        }
+        for src_id, tgt_id in pairs
+    ])
     print(f"  Controls added: {controls_added}, Mappings added: {mappings_added}")
 
 
@@ -303,6 +346,10 @@ def main():
 
     session = SyncSession()
     try:
+        # The whole seed is one transaction; if the server crashes before the
+        # WAL is flushed, re-running the (idempotent) seed recovers it.
+        session.execute(text("SET LOCAL synchronous_commit TO OFF"))
+
         print("Seeding frameworks...")
         fw_map = seed_frameworks(session)
 
@@ -310,23 +357,26 @@ def main():
         seed_iso_controls(session, fw_map["ISO27001"])
 
         # Fix placeholder clause titles from prior seeds
-        for clause_id, clause_title in ISO_27001_CLAUSES.items():
-            ctrl = session.execute(
-                select(Control).where(
-                    Control.framework_id == fw_map["ISO27001"],
-                    Control.control_id == clause_id,
-                )
-            ).scalar_one_or_none()
-            if ctrl and ctrl.title != clause_title:
-                ctrl.title = clause_title
-        session.flush()
+        clause_titles = values(
+            column("control_id", String), column("title", String), name="clause_titles"
+        ).data(list(ISO_27001_CLAUSES.items()))
+        session.execute(
+            update(Control)
+            .where(
+                Control.framework_id == fw_map["ISO27001"],
+                Control.control_id == clause_titles.c.control_id,
+                Control.title != clause_titles.c.title,
+            )
+            .values(title=clause_titles.c.title)
+            .execution_options(synchronize_session=False)
+        )
 
         if args.bsi:
             bsi_path = Path(args.bsi)
             if bsi_path.exists():
                 print(f"Ingesting BSI PDF: {bsi_path}")
-                content = bsi_path.read_bytes()
-                result = parse_bsi_zuordnung_pdf(content, "BSI Zuordnungstabelle")
+                # Parsers read from the path directly instead of a full in-memory copy
+                result = parse_bsi_zuordnung_pdf(bsi_path, "BSI Zuordnungstabelle")
                 ingest_document(session, result, fw_map["BSI"], fw_map["ISO27001"], bsi_path.name)
             else:
                 print(f"  BSI file not found: {bsi_path}")
@@ -335,8 +385,7 @@ def main():
             c5_path = Path(args.c5)
             if c5_path.exists():
                 print(f"Ingesting C5 Excel: {c5_path}")
-                content = c5_path.read_bytes()
-                result = parse_excel(content, "C5 Cross-Reference")
+                result = parse_excel(c5_path, "C5 Cross-Reference")
                 ingest_document(session, result, fw_map["C5"], fw_map["ISO27001"], c5_path.name)
             else:
                 print(f"  C5 file not found: {c5_path}")
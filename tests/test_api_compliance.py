@@ -104,7 +104,10 @@ async def test_get_tuples(client):
         json={
             "name": "GDPR",
             "short_name": "GDPR",
-            "full_text": "Personal data means any information relating to an identified natural person.",
+            "full_text": (
+                "Personal data means any information relating to an identified natural person. "
+                "User data must not be shared with third parties without explicit consent."
+            ),
         },
     )
     reg_id = reg_resp.json()["id"]
@@ -117,6 +120,21 @@ async def test_get_tuples(client):
     assert "tuples" in data
     assert isinstance(data["tuples"], list)
 
+    # Paged
+    assert data["count"] >= 2
+    first = (await client.get(f"/api/regulations/{reg_id}/tuples", params={"limit": 1})).json()
+    second = (await client.get(
+        f"/api/regulations/{reg_id}/tuples", params={"limit": 1, "offset": 1}
+    )).json()
+    assert len(first["tuples"]) == 1
+    assert len(second["tuples"]) == 1
+    assert first["tuples"][0]["id"] != second["tuples"][0]["id"]
+    assert first["count"] == second["count"] == data["count"]
+
+    rest = (await client.get(f"/api/regulations/{reg_id}/tuples", params={"offset": 1})).json()
+    assert [t["id"] for t in rest["tuples"]] == [t["id"] for t in data["tuples"][1:]]
+    assert rest["count"] == data["count"]
+
 
 @pytest.mark.asyncio
 async def test_compliance_check(client):
@@ -0,0 +1,361 @@
+"""Tests for the framework mapping API (lookup, coverage, import).
+
+Runs the FastAPI app against an in-memory SQLite database seeded with a
+small ISO 27001 / C5 fixture.
+"""
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from database import Base, Framework, Control, Mapping
+
+
+@pytest_asyncio.fixture
+async def client():
+    test_engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
+    test_session_factory = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with test_session_factory() as session:
+        iso = Framework(id=1, name="ISO/IEC 27001:2022", short_name="ISO27001", version="2022")
+        c5 = Framework(id=2, name="C5", short_name="C5", version="2020")
+        bsi = Framework(id=3, name="BSI", short_name="BSI", version="2022")
+        session.add_all([iso, c5, bsi])
+        session.add_all([
+            Control(id=1, framework_id=1, control_id="A.5.1", title="Policies", category="Organizational"),
+            Control(id=2, framework_id=1, control_id="A.5.2", title="Roles", category="Organizational"),
+            Control(id=3, framework_id=1, control_id="A.8.24", title="Cryptography", category="Technological"),
+            Control(id=10, framework_id=2, control_id="OIS-01", title="ISMS", category="OIS"),
+            Control(id=11, framework_id=2, control_id="OIS-02", title="Policy", category="OIS"),
+            Control(id=12, framework_id=2, control_id="CRY-01", title="Crypto policy", category="CRY"),
+            Control(id=20, framework_id=3, control_id="ISMS.1.A1", title="Leitung", category="ISMS"),
+        ])
+        session.add_all([
+            Mapping(id=1, source_control_id=1, target_control_id=10, confidence=1.0, source_type="official"),
+            Mapping(id=2, source_control_id=11, target_control_id=1, confidence=0.7, source_type="manual"),
+            Mapping(id=3, source_control_id=1, target_control_id=20, confidence=1.0, source_type="official"),
+            Mapping(id=4, source_control_id=3, target_control_id=20, confidence=1.0, source_type="official"),
+        ])
+        await session.commit()
+
+    async def override_get_session():
+        async with test_session_factory() as session:
+            yield session
+
+    from app import app, invalidate_cache
+    from database import get_session
+    app.dependency_overrides[get_session] = override_get_session
+    invalidate_cache()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+    app.dependency_overrides.clear()
+    await test_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_coverage_table_groups_mappings_per_source(client):
+    resp = await client.get("/api/coverage/table", params={"source": 1, "target": 2})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["source_framework"] == "ISO27001"
+    assert data["target_framework"] == "C5"
+
+    rows = data["rows"]
+    assert [r["source_id"] for r in rows] == ["A.5.1", "A.5.1", "A.5.2", "A.8.24"]
+    assert {r["target_id"] for r in rows if r["source_id"] == "A.5.1"} == {"OIS-01", "OIS-02"}
+
+
+@pytest.mark.asyncio
+async def test_coverage_table_emits_gap_rows(client):
+    resp = await client.get("/api/coverage/table", params={"source": 1, "target": 2})
+    gaps = [r for r in resp.json()["rows"] if r["source_type"] == "gap"]
+    # A.8.24 is only mapped into BSI, so it is a gap towards C5.
+    assert [g["source_id"] for g in gaps] == ["A.5.2", "A.8.24"]
+    assert all(g["mapping_id"] is None and g["target_id"] == "" for g in gaps)
+
+
+@pytest.mark.asyncio
+async def test_coverage_table_unknown_framework(client):
+    resp = await client.get("/api/coverage/table", params={"source": 1, "target": 99})
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_coverage_export_returns_workbook(client):
+    resp = await client.get("/api/coverage/export", params={"source": 1, "target": 2})
+    assert resp.status_code == 200
+    assert resp.content[:2] == b"PK"
+
+
+@pytest.mark.asyncio
+async def test_get_mappings_is_bidirectional(client):
+    resp = await client.get("/api/mappings/A.5.1", params={"framework_id": 1})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["source"]["framework_short_name"] == "ISO27001"
+    targets = {(m["control_id"], m["framework_short_name"]) for m in data["mappings"]}
+    assert targets == {("OIS-01", "C5"), ("OIS-02", "C5"), ("ISMS.1.A1", "BSI")}
+
+
+@pytest.mark.asyncio
+async def test_get_mappings_unknown_control(client):
+    resp = await client.get("/api/mappings/NOPE-99")
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_search_controls_exact_match_first(client):
+    resp = await client.get("/api/controls", params={"q": "ois-02"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 1
+    item = data["items"][0]
+    assert item["control_id"] == "OIS-02"
+    assert item["framework_short_name"] == "C5"
+
+
+@pytest.mark.asyncio
+async def test_search_controls_paginates(client):
+    resp = await client.get("/api/controls", params={"framework_id": 1, "limit": 2, "offset": 1})
+    data = resp.json()
+    assert data["total"] == 3
+    assert [i["control_id"] for i in data["items"]] == ["A.5.2", "A.8.24"]
+
+
+@pytest.mark.asyncio
+async def test_import_skips_existing_controls_and_mappings(client):
+    resp = await client.post("/api/import", json={
+        "source_framework_id": 1,
+        "target_framework_id": 2,
+        "source_document": "c5.xlsx",
+        "controls": [
+            {"control_id": "OIS-01", "title": "ISMS"},
+            {"control_id": "OIS-03", "title": "Contacts"},
+            {"control_id": "OIS-03", "title": "Contacts (duplicate row)"},
+        ],
+        "mappings": [
+            {"source": "A.5.1", "target": "OIS-01"},
+            {"source": "A.5.2", "target": "OIS-03"},
+            {"source": "A.5.2", "target": "OIS-03"},
+        ],
+    })
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["success"] is True
+    assert data["controls_added"] == 1
+    assert data["mappings_added"] == 1
+
+    resp = await client.get("/api/mappings/OIS-03", params={"framework_id": 2})
+    assert [m["control_id"] for m in resp.json()["mappings"]] == ["A.5.2"]
+
+
+@pytest.mark.asyncio
+async def test_import_creates_missing_source_controls(client):
+    resp = await client.post("/api/import", json={
+        "source_framework_id": 1,
+        "target_framework_id": 2,
+        "controls": [],
+        "mappings": [{"source": "6.1", "target": "OIS-02"}],
+    })
+    data = resp.json()
+    assert data["mappings_added"] == 1
+
+    resp = await client.get("/api/mappings/6.1", params={"framework_id": 1})
+    assert resp.status_code == 200
+    assert [m["control_id"] for m in resp.json()["mappings"]] == ["OIS-02"]
+
+
+@pytest.mark.asyncio
+async def test_import_unknown_framework(client):
+    resp = await client.post("/api/import", json={
+        "source_framework_id": 1,
+        "target_framework_id": 99,
+    })
+    data = resp.json()
+    assert data["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_add_version_changes_bulk(client):
+    resp = await client.post("/api/versions/ISO27001/changes", json=[
+        {"old_version": "2013", "new_version": "2022", "change_type": "new", "new_control_id": "A.5.7"},
+        {"old_version": "2013", "new_version": "2022", "change_type": "merged",
+         "old_control_id": "A.6.1.1", "new_control_id": "A.5.2"},
+    ])
+    assert resp.json() == {"added": 2}
+
+    resp = await client.get("/api/versions/ISO27001/transitions")
+    assert resp.json() == [{"old_version": "2013", "new_version": "2022", "change_count": 2}]
+
+    resp = await client.get("/api/versions/ISO27001/changes", params={"from": "2013", "to": "2022"})
+    assert [c["change_type"] for c in resp.json()] == ["merged", "new"]
+
+
+def test_response_cache_is_bounded_lru(monkeypatch):
+    import app
+    monkeypatch.setattr(app, "API_CACHE_MAXSIZE", 2)
+    app.invalidate_cache()
+    app._cache_set(("a",), 1)
+    app._cache_set(("b",), 2)
+    assert app._cache_get(("a",)) == 1
+    app._cache_set(("c",), 3)
+    assert list(app._response_cache) == [("a",), ("c",)]
+
+    monkeypatch.setattr(app.time, "monotonic", lambda: float("inf"))
+    assert app._cache_get(("c",)) is None
+    assert ("c",) not in app._response_cache
+    app.invalidate_cache()
+
+
+@pytest.mark.asyncio
+async def test_framework_list_cache_invalidated_on_write(client):
+    resp = await client.get("/api/frameworks")
+    assert {f["short_name"] for f in resp.json()} == {"ISO27001", "C5", "BSI"}
+    iso = next(f for f in resp.json() if f["short_name"] == "ISO27001")
+    assert iso["control_count"] == 3
+
+    resp = await client.post("/api/frameworks", json={"name": "NIST CSF", "short_name": "NIST"})
+    assert resp.status_code == 200
+
+    resp = await client.get("/api/frameworks")
+    assert "NIST" in {f["short_name"] for f in resp.json()}
+
+
+@pytest.mark.asyncio
+async def test_coverage_table_streams_csv(client):
+    resp = await client.get("/api/coverage/table", params={"source": 1, "target": 2, "format": "csv"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    lines = resp.text.strip().splitlines()
+    assert lines[0].startswith("mapping_id,source_id,")
+    assert [line.split(",")[1] for line in lines[1:]] == ["A.5.1", "A.5.1", "A.5.2", "A.8.24"]
+
+
+@pytest.mark.asyncio
+async def test_coverage_table_streams_ndjson(client):
+    import json
+
+    resp = await client.get("/api/coverage/table", params={"source": 1, "target": 2, "format": "ndjson"})
+    assert resp.status_code == 200
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    json_rows = (await client.get("/api/coverage/table", params={"source": 1, "target": 2})).json()["rows"]
+    assert rows == json_rows
+
+
+@pytest.mark.asyncio
+async def test_coverage_counts_and_gaps(client):
+    resp = await client.get("/api/coverage", params={"source": 1, "target": 2})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total_source_controls"] == 3
+    assert data["mapped_controls"] == 1
+    assert data["coverage_percentage"] == 33.3
+    assert [c["id"] for c in data["unmapped_control_ids"]] == ["A.5.2", "A.8.24"]
+    # OIS-02 only maps via the reverse direction, so CRY-01 is the sole gap.
+    assert [c["id"] for c in data["gap_controls"]] == ["CRY-01"]
+
+
+@pytest.mark.asyncio
+async def test_frameworks_and_controls_honour_if_none_match(client):
+    etags = {}
+    for path in ("/api/frameworks", "/api/controls"):
+        resp = await client.get(path)
+        assert resp.status_code == 200
+        etags[path] = resp.headers["etag"]
+
+        resp = await client.get(path, headers={"If-None-Match": etags[path]})
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+    etag = etags["/api/frameworks"]
+    for header, status in (
+        (f'"x", W/{etag}', 304),
+        ("*", 304),
+        (etag[:-2] + '"', 200),
+        (f'"{etag}"', 200),
+    ):
+        resp = await client.get("/api/frameworks", headers={"If-None-Match": header})
+        assert resp.status_code == status, header
+
+    await client.post("/api/frameworks", json={"name": "NIST CSF", "short_name": "NIST"})
+    resp = await client.get("/api/frameworks", headers={"If-None-Match": etags["/api/frameworks"]})
+    assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_gzipped(client):
+    await client.post("/api/import", json={
+        "source_framework_id": 1,
+        "target_framework_id": 2,
+        "controls": [{"control_id": f"OPS-{i:02d}", "title": "Operations control"} for i in range(40)],
+    })
+    resp = await client.get("/api/controls", params={"limit": 500}, headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers.get("content-encoding") == "gzip"
+    assert resp.json()["total"] == 47
+
+    resp = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_free_text_search_is_not_cached(client):
+    import app
+    await client.get("/api/controls", params={"q": "OIS"})
+    await client.get("/api/controls", params={"limit": 10})
+    assert [k for k in app._response_cache if k[0] == "controls"] == [("controls", None, 10, 0)]
+
+
+@pytest.mark.asyncio
+async def test_control_search_cache_invalidated_on_import(client):
+    resp = await client.get("/api/controls", params={"q": "OIS"})
+    assert resp.json()["total"] == 2
+
+    await client.post("/api/import", json={
+        "source_framework_id": 1,
+        "target_framework_id": 2,
+        "controls": [{"control_id": "OIS-03", "title": "Contacts"}],
+    })
+    resp = await client.get("/api/controls", params={"q": "OIS"})
+    assert resp.json()["total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_description_stats(client):
+    from sqlalchemy import update
+    from app import app
+    from database import get_session
+
+    # Short, long and NULL descriptions: only the long one counts.
+    descriptions = {1: "Too short", 2: "A description well over twenty characters", 3: None}
+    async for session in app.dependency_overrides[get_session]():
+        for pk, description in descriptions.items():
+            await session.execute(update(Control).where(Control.id == pk).values(description=description))
+        await session.commit()
+
+    resp = await client.get("/api/frameworks/1/description-stats")
+    data = resp.json()
+    assert data["total_controls"] == 3
+    assert data["controls_with_description"] == 1
+    assert data["controls_without_description"] == 2
+    assert data["description_coverage_pct"] == 33
+
+
+@pytest.mark.asyncio
+async def test_create_mapping_checks_both_controls(client):
+    resp = await client.post("/api/mappings", json={"source_control_id": 2, "target_control_id": 999})
+    assert resp.status_code == 404
+
+    resp = await client.post("/api/mappings", json={"source_control_id": 2, "target_control_id": 12})
+    assert resp.status_code == 201
+    assert resp.json()["source_control_id"] == 2
+
+    resp = await client.post("/api/mappings", json={"source_control_id": 12, "target_control_id": 2})
+    assert resp.status_code == 409
@@ -168,3 +168,26 @@ def test_business_process_chunk_has_required_fields():
     cols = {c.name for c in BusinessProcessChunk.__table__.columns}
     required = {"id", "document_id", "text", "chunk_index", "embedding"}
     assert required.issubset(cols)
+
+
+def test_control_search_indexes():
+    """Control search columns are backed by trigram GIN indexes on PostgreSQL."""
+    from database import Control
+    indexes = {ix.name: ix for ix in Control.__table__.indexes}
+    for col in ("control_id", "title", "description"):
+        ix = indexes[f"ix_controls_{col}_trgm"]
+        assert ix.dialect_options["postgresql"]["using"] == "gin"
+    assert [c.name for c in indexes["ix_controls_control_id_lower"].columns] == ["control_id_lower"]
+    assert [c.name for c in indexes["ix_controls_control_id"].columns] == ["control_id"]
+    assert Control.__table__.c.control_id_lower.computed.persisted is True
+
+
+def test_mapping_lookup_indexes():
+    from database import Mapping, VersionChange
+    mapping_ix = {ix.name: [c.name for c in ix.columns] for ix in Mapping.__table__.indexes}
+    assert mapping_ix["ix_mappings_tgt_src"] == ["target_control_id", "source_control_id"]
+    uniques = {c.name: [col.name for col in c.columns] for c in Mapping.__table__.constraints
+               if c.name and c.name.startswith("uq_")}
+    assert uniques["uq_mapping_pair"] == ["source_control_id", "target_control_id"]
+    vc_ix = {ix.name: [c.name for c in ix.columns] for ix in VersionChange.__table__.indexes}
+    assert vc_ix["ix_vc_fw_old_new"] == ["framework_id", "old_version", "new_version"]
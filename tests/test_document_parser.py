@@ -0,0 +1,168 @@
+"""Tests for the document parser registry (Excel and CSV cross-reference tables)."""
+
+from io import BytesIO
+
+import pandas as pd
+
+
+def _xlsx(sheets: dict[str, list[list]]) -> bytes:
+    buf = BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        for name, rows in sheets.items():
+            pd.DataFrame(rows).to_excel(writer, sheet_name=name, header=False, index=False)
+    return buf.getvalue()
+
+
+def _pdf(pages: list[list[str]]) -> bytes:
+    """Minimal uncompressed PDF with one Helvetica text line per entry."""
+    objs = ["<< /Type /Catalog /Pages 2 0 R >>", "", "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        body = "BT /F1 10 Tf 50 780 Td 12 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        objs.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream")
+        objs.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objs)} 0 R >>"
+        )
+        kids.append(f"{len(objs)} 0 R")
+    objs[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{off:010d} 00000 n \n" for off in offsets).encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+C5_SHEET = [
+    ["C5:2020 cross reference", None, None, None],
+    ["Ref", "Title", "Criteria", "ISO 27001"],
+    ["OIS-01", "ISMS", "Operate an ISMS", "A.5.1, 6.1"],
+    ["OIS-01", "ISMS", "Operate an ISMS", "A.5.2"],
+    ["OIS-02", "Policies", "Document policies", "A.5.1"],
+    ["CRY-01", "Crypto", "Use cryptography", "-"],
+    [None, None, None, None],
+]
+
+
+class TestExcelParser:
+
+    def test_extracts_controls_and_mappings(self):
+        from document_parser import parse_uploaded_bytes
+        result = parse_uploaded_bytes(_xlsx({"Mapping": C5_SHEET}), "c5.xlsx", "C5:2020")
+        assert result["success"]
+        assert [c["control_id"] for c in result["controls"]] == ["OIS-01", "OIS-02", "CRY-01"]
+        assert result["controls"][0] == {
+            "control_id": "OIS-01",
+            "title": "ISMS",
+            "description": "Operate an ISMS",
+            "category": "OIS",
+        }
+        assert result["mappings"] == [
+            {"source": "A.5.1", "target": "OIS-01"},
+            {"source": "6.1", "target": "OIS-01"},
+            {"source": "A.5.2", "target": "OIS-01"},
+            {"source": "A.5.1", "target": "OIS-02"},
+        ]
+
+    def test_reads_from_path(self, tmp_path):
+        from document_parser import parse_excel
+        path = tmp_path / "c5.xlsx"
+        path.write_bytes(_xlsx({"Mapping": C5_SHEET}))
+        assert parse_excel(path, "C5:2020") == parse_excel(path.read_bytes(), "C5:2020")
+
+    def test_prefers_mapping_sheets(self):
+        from document_parser import parse_uploaded_bytes
+        other = [["Ref", "Title", "Criteria", "ISO 27001"], ["AM-01", "Assets", "x", "A.5.9"], ["AM-02", "x", "x", "A.5.9"]]
+        content = _xlsx({"Intro": other, "Mapping": C5_SHEET})
+        result = parse_uploaded_bytes(content, "c5.xlsx", "C5:2020")
+        assert "AM-01" not in {c["control_id"] for c in result["controls"]}
+        assert result["raw_text"].startswith("Parsed 2 sheets, 3 controls")
+
+
+class TestPdfText:
+
+    def test_parallel_extraction_keeps_page_order(self, monkeypatch):
+        import document_parser
+        content = _pdf([[f"Page {i}"] for i in range(1, 10)])
+        serial = document_parser._pdf_page_texts(content)
+        assert [t.strip() for t in serial] == [f"Page {i}" for i in range(1, 10)]
+
+        monkeypatch.setattr(document_parser, "PDF_PARSE_WORKERS", 2)
+        monkeypatch.setattr(document_parser, "_MIN_PAGES_PER_WORKER", 3)
+        assert document_parser._pdf_page_texts(content) == serial
+
+    def test_bsi_zuordnung_annex_mappings(self):
+        from document_parser import parse_uploaded_bytes
+        content = _pdf([
+            ["4.1 Understanding the organization", "BSI-Standard 200-2"],
+            ["A.5.1 Policies ISMS.1.A1 ORP.1.A1", "A.8.24 Cryptography CON.1.A1"],
+        ])
+        result = parse_uploaded_bytes(content, "z.pdf", "BSI Zuordnungstabelle")
+        assert result["success"]
+        assert {"source": "4.1", "target": "BSI-Std-200-2"} in result["mappings"]
+        assert {"source": "A.5.1", "target": "ORP.1.A1"} in result["mappings"]
+        assert {"source": "A.8.24", "target": "CON.1.A1"} in result["mappings"]
+
+    def test_pool_created_once_across_threads(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+        import document_parser
+        monkeypatch.setattr(document_parser, "_PDF_POOL", None)
+        with ThreadPoolExecutor(8) as ex:
+            pools = set(ex.map(lambda _: id(document_parser._get_pdf_pool()), range(32)))
+        assert len(pools) == 1
+        document_parser._PDF_POOL.shutdown()
+
+    def test_parallel_extraction_from_path(self, monkeypatch, tmp_path):
+        import document_parser
+        path = tmp_path / "doc.pdf"
+        path.write_bytes(_pdf([[f"Page {i}"] for i in range(1, 7)]))
+        monkeypatch.setattr(document_parser, "PDF_PARSE_WORKERS", 2)
+        monkeypatch.setattr(document_parser, "_MIN_PAGES_PER_WORKER", 3)
+        texts = document_parser._pdf_page_texts(path)
+        assert [t.strip() for t in texts] == [f"Page {i}" for i in range(1, 7)]
+
+    def test_c5_text_fallback(self):
+        from document_parser import parse_uploaded_bytes
+        content = _pdf([
+            ["Cloud Computing Compliance Criteria Catalogue"],
+            ["OIS-01 Information Security Management System", "The provider operates an ISMS."],
+        ])
+        result = parse_uploaded_bytes(content, "c5.pdf", "C5 PDF")
+        assert result["success"]
+        assert [c["control_id"] for c in result["controls"]] == ["OIS-01"]
+
+
+class TestBsiRequirementPattern:
+
+    def test_strict_requirement_line(self):
+        from document_parser import _BSI_REQUIREMENT_RE
+        m = _BSI_REQUIREMENT_RE.match("APP.1.1.A3 Sicheres Oeffnen  [Benutzende] (B)")
+        assert m.groups() == ("APP.1.1.A3", "Sicheres Oeffnen", "B")
+
+    def test_long_whitespace_run_fails_fast(self):
+        from document_parser import _BSI_REQUIREMENT_RE
+        # Cubic backtracking with the old \s+(.+?)...\s* form; near-instant now.
+        assert _BSI_REQUIREMENT_RE.match("ISMS.1.A1 " + " " * 20000 + "x") is None
+
+
+class TestCsvParser:
+
+    def test_dedupes_target_controls(self):
+        from document_parser import parse_uploaded_bytes
+        content = b"ISO 27001,BSI\nA.5.1,ISMS.1.A1\nA.5.2,ISMS.1.A1\nA.8.24,CON.1.A1\n,ORP.1.A1\n"
+        result = parse_uploaded_bytes(content, "map.csv", "CSV Mapping")
+        assert result["success"]
+        assert [c["control_id"] for c in result["controls"]] == ["ISMS.1.A1", "CON.1.A1"]
+        assert len(result["mappings"]) == 3
+
+
+def test_unknown_extension_is_rejected():
+    from document_parser import parse_uploaded_bytes
+    result = parse_uploaded_bytes(b"", "notes.odt", "C5:2020")
+    assert not result["success"]